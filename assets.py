@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from config import ASSET_LOADER_WORKERS
+
+
+# 작업 스레드가 에셋 하나를 다 읽었을 때 보내는 이벤트 (대기 중인 메인 루프를 깨워서 진행률을 다시 그림)
+ASSET_LOADED_EVENT = pygame.event.custom_type()
+
+
+def read_file(path):
+    """파일 내용을 bytes로 읽음 (디스크 읽기만 작업 스레드에서 하고 해석은 메인 스레드에서 할 때 사용)"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AssetLoader:
+    """폰트 파일 읽기, 효과음 디코딩처럼 오래 걸리는 작업을 작업 스레드에서 미리 시작
+
+    submit은 바로 Future를 반환하고, 사용하는 쪽은 처음 필요할 때 get으로 끝날 때까지 기다린다.
+    그 사이 메인 루프는 타이틀 화면을 그리고 progress로 진행률을 표시한다.
+    """
+    def __init__(self, max_workers=ASSET_LOADER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+        self.futures = {}  # 이름 -> Future
+
+    def submit(self, name, load, *args):
+        """load(*args)를 작업 스레드에서 실행하고 Future 반환"""
+        future = self.executor.submit(load, *args)
+        self.futures[name] = future
+        future.add_done_callback(self._notify)
+        return future
+
+    @staticmethod
+    def _notify(future):
+        # 작업 스레드에서 호출됨 (SDL 이벤트 큐는 다른 스레드에서 넣어도 안전)
+        try:
+            pygame.event.post(pygame.event.Event(ASSET_LOADED_EVENT))
+        except pygame.error:
+            pass  # 이미 게임이 종료됨
+
+    def get(self, name):
+        """name의 결과 (아직 읽는 중이면 끝날 때까지 기다림, 작업 중 난 예외는 여기서 다시 발생)"""
+        return self.futures[name].result()
+
+    def progress(self):
+        """(끝난 작업 수, 전체 작업 수)"""
+        done = sum(1 for future in self.futures.values() if future.done())
+        return done, len(self.futures)
+
+    def is_done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def shutdown(self):
+        """아직 시작하지 않은 작업은 취소하고 실행 중인 작업이 끝날 때까지 기다림 (pygame.quit 전에 호출)"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,90 @@
+import hashlib
+import mmap
+import os
+import threading
+
+import pygame
+
+
+CACHE_EXTENSION = ".pcm"
+
+
+class AudioCache:
+    """효과음 파일을 믹서 포맷 PCM으로 디코딩한 결과를 디스크에 저장해두고 다음 실행부터 재사용
+
+    캐시 파일 이름은 (원본 경로) 해시와 (파일 크기, 수정 시각, 믹서 포맷) 해시로 만든다.
+    원본이 바뀌거나 믹서 포맷이 달라지면 이름이 달라져서 다시 디코딩하고, 같은 원본의 이전 캐시는 지운다.
+    캐시 파일은 헤더 없는 PCM이라 mmap해서 그대로 pygame.mixer.Sound(buffer=...)에 넘긴다.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0  # 디버그용 통계 (작업 스레드에서 동시에 세면 조금 틀릴 수 있음)
+        self.misses = 0
+
+    def cache_path(self, path):
+        """path의 현재 상태 (크기, 수정 시각)와 믹서 포맷에 해당하는 캐시 파일 경로"""
+        stat = os.stat(path)
+        path_key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        version = repr((stat.st_size, stat.st_mtime_ns, pygame.mixer.get_init()))
+        version_key = hashlib.sha1(version.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{path_key}-{version_key}{CACHE_EXTENSION}")
+
+    def load(self, path):
+        """path의 Sound (캐시가 있으면 디코딩 없이 읽고, 없으면 디코딩한 뒤 캐시에 저장)
+
+        작업 스레드 여러 개에서 동시에 호출해도 된다.
+        """
+        cache_path = self.cache_path(path)
+        sound = self._load_cached(cache_path)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)
+        self._store(cache_path, sound.get_raw())
+        return sound
+
+    @staticmethod
+    def _load_cached(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return pygame.mixer.Sound(buffer=data)
+        except (OSError, ValueError, pygame.error):
+            return None
+
+    def _store(self, cache_path, raw):
+        """캐시 파일을 임시 이름으로 쓴 뒤 바꿔치기 (쓰다 만 파일을 읽지 않도록)"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(raw)
+            os.replace(temp_path, cache_path)
+            self._remove_stale(cache_path)
+        except OSError:
+            pass  # 캐시를 못 쓰면 다음 실행에서 다시 디코딩
+
+    def _remove_stale(self, cache_path):
+        """같은 원본 파일의 이전 캐시 (크기, 수정 시각, 믹서 포맷이 다를 때 만든 것) 삭제"""
+        name = os.path.basename(cache_path)
+        path_key = name.split("-")[0]
+        for other in os.listdir(self.cache_dir):
+            if other != name and other.startswith(path_key + "-") and other.endswith(CACHE_EXTENSION):
+                try:
+                    os.remove(os.path.join(self.cache_dir, other))
+                except OSError:
+                    pass
+
+    def clear(self):
+        """캐시 파일 전부 삭제"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_EXTENSION):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
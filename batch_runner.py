@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import MAX_STAGE
+from batch_physics import BatchPhysics, numpy_available
+from entities import Player
+from simulation import World, KeyState, EVENT_DIED
+
+
+def normalize_job(job):
+    """(스테이지, 플레이어 수, 입력 스크립트) 튜플 또는 dict를 dict 형태로 통일
+
+    입력 스크립트는 [틱 수, [플레이어별 입력 비트마스크...]] 구간의 리스트
+    (예: [[60, [2, 0]], [30, [6, 2]]] → 60틱 동안 P1 오른쪽, 30틱 동안 P1 오른쪽+점프, P2 오른쪽)
+    """
+    if isinstance(job, dict):
+        job = dict(job)
+    else:
+        stage, player_count, script = job
+        job = {"stage": stage, "player_count": player_count, "script": script}
+    job.setdefault("player_count", 2)
+    job.setdefault("script", [])
+    job.setdefault("max_ticks", sum(ticks for ticks, _ in job["script"]))
+    job.setdefault("stop_on_death", True)
+    return job
+
+
+def iter_script(script):
+    """입력 스크립트를 틱마다 KeyState로 펼침"""
+    for ticks, inputs in script:
+        keys = KeyState.from_inputs(inputs)
+        for _ in range(ticks):
+            yield keys
+
+
+def run_job(job):
+    """스테이지 하나를 헤드리스로 끝까지 진행하고 결과 dict 반환"""
+    job = normalize_job(job)
+    world = World(job["stage"], None, job["player_count"])
+    idle = KeyState()
+    script = iter_script(job["script"])
+    died = False
+    for _ in range(job["max_ticks"]):
+        events = world.step(next(script, idle))
+        if EVENT_DIED in events:
+            died = True
+            if job["stop_on_death"]:
+                break
+        if world.cleared:
+            break
+    return {
+        "stage": job["stage"],
+        "player_count": job["player_count"],
+        "cleared": world.cleared,
+        "died": died,
+        "deaths": world.deaths,
+        "ticks": world.tick,
+        "positions": [(p.x, p.y) for p in world.active_players],
+    }
+
+
+def run_jobs(jobs, workers=None):
+    """여러 작업을 프로세스 풀에서 병렬로 실행 (workers=1이면 현재 프로세스에서 실행)
+
+    (작업별 결과 리스트, 전체 통계 dict) 반환
+    """
+    jobs = [normalize_job(job) for job in jobs]
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = [run_job(job) for job in jobs]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_job, jobs, chunksize=chunksize))
+    seconds = time.perf_counter() - start
+    total_ticks = sum(result["ticks"] for result in results)
+    stats = {
+        "jobs": len(results),
+        "cleared": sum(1 for result in results if result["cleared"]),
+        "died": sum(1 for result in results if result["died"]),
+        "ticks": total_ticks,
+        "seconds": seconds,
+        "ticks_per_second": total_ticks / seconds if seconds > 0 else 0.0,
+        "jobs_per_second": len(results) / seconds if seconds > 0 else 0.0,
+    }
+    return results, stats
+
+
+def check_batch_job(job):
+    """같은 랜덤 입력으로 일반 World와 batch_physics World를 진행하며 틱마다 snapshot 비교
+
+    job은 (스테이지, 플레이어 수, 틱 수, 시드, 입력 유지 틱 수). 처음 달라진 틱 (끝까지 같으면 None) 반환.
+    """
+    stage, player_count, ticks, seed, hold = job
+    rng = random.Random(seed)
+    scalar = World(stage, None, player_count)
+    batch = World(stage, None, player_count, batch_physics=True)
+    keys = KeyState()
+    for tick in range(ticks):
+        if tick % hold == 0:
+            # 방향키와 점프만 (상호작용 키는 누르지 않음)
+            keys = KeyState.from_inputs([rng.randrange(8) for _ in range(player_count)])
+        scalar.step(keys)
+        batch.step(keys)
+        if scalar.snapshot() != batch.snapshot():
+            return scalar.tick
+        if scalar.cleared:
+            break
+    return None
+
+
+def check_batch_jobs(ticks, seeds):
+    """모든 일반 스테이지 x 플레이어 수(2, 3) x 시드 x 입력 유지 틱 수(4, 15, 30) 비교 작업 목록"""
+    return [(stage, count, ticks, seed, hold) for stage in (1, 2, 3, 5) for count in (2, 3)
+            for seed in range(seeds) for hold in (4, 15, 30)]
+
+
+def benchmark_batch(player_count, ticks=300, seed=0):
+    """플레이어 player_count명을 1스테이지 플랫폼에서 같은 랜덤 입력으로 진행해 틱당 시간 (초) 비교
+
+    Player.update를 순서대로 부르는 것과 BatchPhysics.step을 번갈아 실행하고, 매 틱 결과가 같은지도
+    확인한다 (다르면 AssertionError). (Player.update 시간, BatchPhysics 시간) 반환.
+    """
+    platforms = World(1, None, 2).platform_grid
+
+    def create_players():
+        # 키 코드는 플레이어마다 (왼쪽, 오른쪽, 점프) 3개씩, 높이를 섞어서 떨어지며 서로 쌓이도록 배치
+        return [Player(10 + i * 900 // player_count, 60 + (i % 5) * 70,
+                       key_left=3 * i, key_right=3 * i + 1, key_up=3 * i + 2) for i in range(player_count)]
+
+    players = create_players()
+    batch_players = create_players()
+    batch = BatchPhysics.from_players(batch_players)
+    batch.set_platforms(platforms)
+    rng = random.Random(seed)
+    keys = KeyState()
+    scalar_seconds = batch_seconds = 0.0
+    for tick in range(ticks):
+        if tick % 15 == 0:
+            keys = KeyState(key for key in range(3 * player_count) if rng.random() < 0.3)
+        start = time.perf_counter()
+        for i, player in enumerate(players):
+            player.update(keys, platforms, [other for j, other in enumerate(players) if j != i])
+        scalar_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        batch.step([keys[p.key_left] for p in batch_players], [keys[p.key_right] for p in batch_players],
+                   [keys[p.key_up] for p in batch_players])
+        batch_seconds += time.perf_counter() - start
+        batch.store_players(batch_players)
+        assert ([(p.x, p.y, p.vel_y, p.on_ground) for p in players] ==
+                [(p.x, p.y, p.vel_y, p.on_ground) for p in batch_players]), f"tick {tick}"
+    return scalar_seconds / ticks, batch_seconds / ticks
+
+
+def smoke_jobs(ticks):
+    """모든 스테이지 x 플레이어 수(2, 3)를 입력 없이 ticks틱 동안 돌리는 작업 목록"""
+    return [{"stage": stage, "player_count": count, "script": [], "max_ticks": ticks}
+            for stage in range(1, MAX_STAGE + 1) for count in (2, 3)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스테이지 시뮬레이션을 여러 프로세스에서 한 번에 실행")
+    parser.add_argument("jobs", nargs="?", help="작업 목록 JSON 파일 (dict 또는 [stage, player_count, script] 리스트)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--output", help="작업별 결과를 저장할 JSON 파일")
+    parser.add_argument("--smoke", type=int, metavar="TICKS",
+                        help="작업 파일 대신 모든 스테이지를 입력 없이 TICKS틱 동안 실행")
+    parser.add_argument("--check-batch", type=int, metavar="TICKS",
+                        help="랜덤 입력으로 TICKS틱 동안 BatchPhysics와 Player.update 결과가 같은지 검사")
+    parser.add_argument("--seeds", type=int, default=10, help="--check-batch에서 쓸 랜덤 입력 시드 수")
+    parser.add_argument("--bench-batch", type=int, nargs="+", metavar="PLAYERS",
+                        help="플레이어 수별로 Player.update와 BatchPhysics의 틱당 시간 비교")
+    args = parser.parse_args(argv)
+
+    if args.check_batch or args.bench_batch:
+        if not numpy_available():
+            parser.error("--check-batch, --bench-batch에는 numpy가 필요합니다 (pip install numpy)")
+    if args.bench_batch:
+        for player_count in args.bench_batch:
+            scalar_seconds, batch_seconds = benchmark_batch(player_count)
+            print(f"{player_count:4} players: Player.update {scalar_seconds * 1000:.2f} ms/tick, "
+                  f"BatchPhysics {batch_seconds * 1000:.2f} ms/tick")
+        return 0
+    if args.check_batch:
+        jobs = check_batch_jobs(args.check_batch, args.seeds)
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check_batch_job, jobs))
+        diverged = [(job, tick) for job, tick in zip(jobs, results) if tick is not None]
+        for (stage, count, _, seed, hold), tick in diverged:
+            print(f"DIVERGED stage {stage} x{count} seed {seed} hold {hold}: tick {tick}")
+        print(f"{len(jobs) - len(diverged)}/{len(jobs)} runs match")
+        return 1 if diverged else 0
+
+    if args.smoke:
+        jobs = smoke_jobs(args.smoke)
+    elif args.jobs:
+        with open(args.jobs, encoding="utf-8") as f:
+            jobs = json.load(f)
+    else:
+        parser.error("작업 파일 또는 --smoke가 필요합니다")
+
+    results, stats = run_jobs(jobs, args.workers)
+    for result in results:
+        outcome = "CLEAR" if result["cleared"] else ("DIED" if result["died"] else "-")
+        print(f"stage {result['stage']} x{result['player_count']}: {outcome:5} ticks={result['ticks']}")
+    print(f"{stats['jobs']} jobs, {stats['cleared']} cleared, {stats['died']} died, "
+          f"{stats['ticks']} ticks in {stats['seconds']:.2f}s ({stats['ticks_per_second']:.0f} ticks/s)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "stats": stats}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
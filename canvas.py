@@ -0,0 +1,158 @@
+import weakref
+
+import pygame
+
+
+# 게임 좌표 (WIDTH x HEIGHT) 1픽셀당 실제로 그리는 Surface의 픽셀 수의 역수 (create_display가 설정)
+render_divisor = 1
+
+
+def set_render_divisor(divisor):
+    global render_divisor
+    render_divisor = divisor
+
+
+def _floor_point(point, divisor):
+    return int(point[0] // divisor), int(point[1] // divisor)
+
+
+def _shape_rect(rect, divisor):
+    """도형을 그릴 Rect (모서리를 내림해서 붙어 있는 도형끼리 틈이 생기지 않게 하고, 최소 1픽셀)"""
+    rect = pygame.Rect(rect)
+    left, top = rect.x // divisor, rect.y // divisor
+    return pygame.Rect(left, top, max(rect.right // divisor - left, 1), max(rect.bottom // divisor - top, 1))
+
+
+def _cover_rect(rect, divisor):
+    """rect를 완전히 덮는 Rect (clip, 다시 그릴 영역, 화면 갱신 영역용)"""
+    rect = pygame.Rect(rect)
+    left, top = rect.x // divisor, rect.y // divisor
+    return pygame.Rect(left, top, -(-rect.right // divisor) - left, -(-rect.bottom // divisor) - top)
+
+
+def _scaled_width(width, divisor):
+    """선 두께 (0은 채우기라서 그대로, 나머지는 최소 1픽셀)"""
+    return max(width // divisor, 1) if width > 0 else 0
+
+
+class Canvas:
+    """게임 좌표로 그리면 1/divisor 해상도 Surface에 그려지는 화면 Surface 대용
+
+    blit, fill, set_clip, copy, get_rect처럼 게임에서 쓰는 Surface 메서드만 제공하고,
+    도형은 pygame.draw 대신 이 모듈의 draw_* 함수로 그린다.
+    게임 해상도 Surface (텍스트, 스프라이트, 오버레이)를 blit하면 한 번만 축소해서 보관하므로
+    blit하는 Surface는 처음 blit한 뒤에 수정하면 안 된다 (TextCache, SurfaceCache, SpriteCache와 같은 규칙).
+    """
+    def __init__(self, surface, divisor):
+        self.surface = surface
+        self.divisor = divisor
+        self.size = (surface.get_width() * divisor, surface.get_height() * divisor)
+        self._scaled = weakref.WeakKeyDictionary()  # 게임 해상도 Surface -> 축소한 Surface
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self.size)
+
+    def fill(self, color, rect=None):
+        self.surface.fill(color, None if rect is None else _shape_rect(rect, self.divisor))
+
+    def set_clip(self, rect):
+        self.surface.set_clip(None if rect is None else _cover_rect(rect, self.divisor))
+
+    def copy(self):
+        return Canvas(self.surface.copy(), self.divisor)
+
+    def scaled(self, source):
+        """게임 해상도 Surface를 이 Canvas 해상도로 축소한 Surface (캐시)"""
+        scaled = self._scaled.get(source)
+        if scaled is None:
+            size = (-(-source.get_width() // self.divisor), -(-source.get_height() // self.divisor))
+            # 화면 확대와 같은 nearest-neighbour (평균을 내면 도트 그림이 흐려짐)
+            scaled = self._scaled[source] = pygame.transform.scale(source, size)
+        return scaled
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        if isinstance(source, Canvas):
+            source = source.surface
+        else:
+            source = self.scaled(source)
+        if area is not None:
+            area = _cover_rect(area, self.divisor)
+        self.surface.blit(source, _floor_point(dest, self.divisor), area, special_flags)
+
+
+def target_surface(surface):
+    """실제로 그려지는 pygame Surface (Canvas면 축소 해상도 Surface)"""
+    return surface.surface if isinstance(surface, Canvas) else surface
+
+
+def target_rect(surface, rect):
+    """게임 좌표 rect를 완전히 덮는 target_surface(surface) 좌표 Rect"""
+    return _cover_rect(rect, surface.divisor) if isinstance(surface, Canvas) else pygame.Rect(rect)
+
+
+def new_surface(size):
+    """화면과 같은 해상도 (render_divisor)와 픽셀 포맷의 게임 좌표 size Surface (정적 레이어용)"""
+    surface = pygame.Surface((size[0] // render_divisor, size[1] // render_divisor))
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    return Canvas(surface, render_divisor) if render_divisor > 1 else surface
+
+
+def draw_rect(surface, color, rect, width=0, border_radius=0):
+    """pygame.draw.rect와 같지만 Canvas에도 게임 좌표로 그림"""
+    if isinstance(surface, Canvas):
+        divisor = surface.divisor
+        return pygame.draw.rect(surface.surface, color, _shape_rect(rect, divisor),
+                                _scaled_width(width, divisor), border_radius=border_radius // divisor)
+    return pygame.draw.rect(surface, color, rect, width, border_radius=border_radius)
+
+
+def draw_circle(surface, color, center, radius, width=0):
+    """pygame.draw.circle과 같지만 Canvas에도 게임 좌표로 그림"""
+    if isinstance(surface, Canvas):
+        divisor = surface.divisor
+        return pygame.draw.circle(surface.surface, color, _floor_point(center, divisor),
+                                  max(radius // divisor, 1), _scaled_width(width, divisor))
+    return pygame.draw.circle(surface, color, center, radius, width)
+
+
+def draw_line(surface, color, start, end, width=1):
+    """pygame.draw.line과 같지만 Canvas에도 게임 좌표로 그림"""
+    if isinstance(surface, Canvas):
+        divisor = surface.divisor
+        return pygame.draw.line(surface.surface, color, _floor_point(start, divisor),
+                                _floor_point(end, divisor), _scaled_width(width, divisor))
+    return pygame.draw.line(surface, color, start, end, width)
+
+
+def draw_polygon(surface, color, points, width=0):
+    """pygame.draw.polygon과 같지만 Canvas에도 게임 좌표로 그림"""
+    if isinstance(surface, Canvas):
+        divisor = surface.divisor
+        return pygame.draw.polygon(surface.surface, color, [_floor_point(point, divisor) for point in points],
+                                   _scaled_width(width, divisor))
+    return pygame.draw.polygon(surface, color, points, width)
+
+
+def mouse_pos():
+    """pygame.mouse.get_pos()와 같지만 게임 좌표 (SDL은 축소 해상도 Surface 좌표로 알려줌)"""
+    x, y = pygame.mouse.get_pos()
+    return x * render_divisor, y * render_divisor
+
+
+def to_game_coords(event):
+    """마우스 이벤트의 pos, rel을 게임 좌표로 바꿈 (이벤트 루프에서 처리하기 전에 호출)"""
+    if render_divisor > 1 and event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        event.pos = (event.pos[0] * render_divisor, event.pos[1] * render_divisor)
+        if event.type == pygame.MOUSEMOTION:
+            event.rel = (event.rel[0] * render_divisor, event.rel[1] * render_divisor)
+    return event
@@ -1,6 +1,18 @@
 WIDTH, HEIGHT = 960, 640
+# 창 크기 배율: 게임은 WIDTH x HEIGHT로 그리고 창에 정수배로 확대 (1: 확대 안 함, 0: 화면에 맞는 최대 배율)
+RENDER_SCALE = 1
+# 내부 렌더링 해상도 나눗수: 2면 게임을 WIDTH/2 x HEIGHT/2 Surface에 그리고 창에 한 번 확대 (그리는 비용 약 1/4, 저사양 기기용)
+RENDER_DIVISOR = 1
 TITLE = "Platformer (Modular Version)"
 FPS = 60
+# 메뉴처럼 움직이는 것이 없는 화면에서 입력이 없을 때 다시 그리는 간격 (ms)
+IDLE_TIMEOUT_MS = 500
+# 폰트, 효과음을 미리 읽어두는 작업 스레드 수 (타이틀 화면을 그리는 동안 백그라운드에서 로드)
+ASSET_LOADER_WORKERS = 2
+# 효과음을 디코딩한 PCM을 저장해두고 다음 실행부터 재사용하는 폴더 (게임 폴더 기준, None이면 캐시 안 함)
+AUDIO_CACHE_DIR = "audio_cache"
+# 창과 오디오 장치 없이 실행 (SDL dummy 비디오 드라이버 + NullSoundManager, 서버/CI용). main.py --headless로도 켤 수 있음
+HEADLESS = False
 MAX_STAGE = 6
 
 # 피코파크 스타일 색상 팔레트
@@ -20,3 +32,12 @@ GRAVITY = 0.6
 PICO_TEXT_COLOR = (255, 140, 60)  # 쨍하고 붉은 기가 도는 주황색 (피코파크 스타일)
 PICO_FLOOR_COLOR = (255, 140, 60)  # 바닥 색상 (폰트 색상과 동일)
 
+# 입력 리플레이 기록 (버그 재현용): True면 스테이지를 플레이할 때마다 REPLAY_DIR에 .dndr 파일 저장
+RECORD_REPLAYS = False
+REPLAY_DIR = "replays"
+
+# 게임 로직 틱 속도 (Hz): 성능이 낮은 기기에서는 30으로 낮춤 (화면은 FPS대로 그리고 물리는 한 틱에 더 많이 이동)
+SIM_TICK_RATE = 60
+
+# 게임 화면에서 바뀐 영역만 다시 그리고 화면에 반영 (화면 전체 갱신이 느린 저사양 기기에서 True)
+DIRTY_RECT_RENDERING = False
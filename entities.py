@@ -1,11 +1,82 @@
+import math
+
 import pygame
 
+from canvas import draw_circle, draw_line, draw_polygon, draw_rect
 from config import GRAVITY, WIDTH, HEIGHT, PICO_TEXT_COLOR
+from sprites import sprite_cache, STYLE_PLAYER, STYLE_SYNCED
+from ui import render_text
 
 
-class Player:
-    def __init__(self, x=100, y=300, color=(30, 120, 255), key_left=pygame.K_LEFT, key_right=pygame.K_RIGHT, key_up=pygame.K_UP, key_interact=pygame.K_DOWN):
+class CachedRect:
+    """rect()가 위치가 바뀔 때만 새 Rect를 만들도록 캐시 (반환된 Rect는 수정하지 말 것)"""
+    __slots__ = ("_rect", "_rect_x", "_rect_y")
+
+    def __init__(self):
+        self._rect = None
+        self._rect_x = None
+        self._rect_y = None
+
+    def rect(self):
+        x = self.x
+        y = self.y
+        if x != self._rect_x or y != self._rect_y:
+            self._rect = pygame.Rect(int(x), int(y), self.w, self.h)
+            self._rect_x = x
+            self._rect_y = y
+        return self._rect
+
+
+def nearby_platforms(platforms, area):
+    """platforms가 공간 격자(SpatialGrid)면 area 근처 플랫폼만, 리스트면 전부 반환"""
+    query = getattr(platforms, "query", None)
+    if query is None:
+        return platforms
+    return query(area)
+
+
+def apply_gravity(vel_y, dt):
+    """dt(60Hz 틱 단위) 동안 중력을 받은 뒤의 (Y 속도, Y 이동 거리)
+
+    60Hz 틱을 dt번 진행한 것 (매 틱 속도 += GRAVITY, 위치 += 속도)을 한 번에 계산한 값이라
+    tick rate를 낮춰도 점프 높이와 궤적이 같다. dt=1이면 vel_y + GRAVITY만큼 이동 (60Hz 계산과 같음).
+    """
+    move_y = vel_y * dt + GRAVITY * dt * (dt + 1) / 2
+    return vel_y + GRAVITY * dt, move_y
+
+
+def swept_collides(player_rect, previous_rect, rect, move_x=0, move_y=0):
+    """이동 후 rect와 겹치거나, 이번 이동(move_x 또는 move_y 한 축)으로 rect를 완전히 뚫고 지나갔는지 (swept AABB)
 
+    dt가 커서 한 번에 많이 움직여도 얇은 발판이나 다른 플레이어를 통과하지 않도록 한다.
+    충돌 처리로 이동 방향 반대쪽으로 밀려난 경우는 뚫고 지나간 것으로 보지 않는다.
+    """
+    if player_rect.colliderect(rect):
+        return True
+    if move_x > 0:
+        crossed = previous_rect.right <= rect.left and player_rect.left >= rect.right
+    elif move_x < 0:
+        crossed = previous_rect.left >= rect.right and player_rect.right <= rect.left
+    elif move_y > 0:
+        crossed = previous_rect.bottom <= rect.top and player_rect.top >= rect.bottom
+    elif move_y < 0:
+        crossed = previous_rect.top >= rect.bottom and player_rect.bottom <= rect.top
+    else:
+        return False
+    if not crossed:
+        return False
+    # 이동하지 않은 축으로는 겹쳐있어야 지나가면서 부딪힘
+    if move_x:
+        return player_rect.top < rect.bottom and player_rect.bottom > rect.top
+    return player_rect.left < rect.right and player_rect.right > rect.left
+
+
+class Player(CachedRect):
+    __slots__ = ("x", "y", "w", "h", "vel_y", "on_ground", "has_key", "speed", "color",
+                 "key_left", "key_right", "key_up", "key_interact", "interacted_with_door", "entered_door")
+
+    def __init__(self, x=100, y=300, color=(30, 120, 255), key_left=pygame.K_LEFT, key_right=pygame.K_RIGHT, key_up=pygame.K_UP, key_interact=pygame.K_DOWN):
+        super().__init__()
         self.x = float(x)
         self.y = float(y)
         self.w = 40
@@ -23,10 +94,7 @@ class Player:
         self.interacted_with_door = False  # 문과 상호작용했는지 추적
         self.entered_door = False  # 문 안으로 들어갔는지 추적
 
-    def rect(self):
-        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
-
-    def update(self, keys, platforms, other_players=None, walls=None):
+    def update(self, keys, platforms, other_players=None, walls=None, dt=1):
         if other_players is None:
             other_players = []
         if walls is None:
@@ -48,15 +116,16 @@ class Player:
             move_dir -= 1
         if right_pressed:
             move_dir += 1
-        move_x = move_dir * self.speed
+        move_x = move_dir * self.speed * dt
+        previous_rect = self.rect()
         self.x += move_x
 
         player_rect = self.rect()
-        # 플랫폼 충돌 처리
-        for platform in platforms:
+        # 플랫폼 충돌 처리 (이동 전후 위치 근처의 플랫폼만 검사)
+        for platform in nearby_platforms(platforms, player_rect.union(previous_rect)):
             # platform이 Rect인지 확인
             if isinstance(platform, pygame.Rect):
-                if player_rect.colliderect(platform):
+                if swept_collides(player_rect, previous_rect, platform, move_x):
                     if move_x > 0:
                         self.x = platform.left - self.w
                     elif move_x < 0:
@@ -103,13 +172,16 @@ class Player:
         
         # 다른 플레이어와의 X축 충돌 처리 (문 안으로 들어간 플레이어는 제외)
         for other in other_players:
-            if other is not self and not other.entered_door and player_rect.colliderect(other.rect()):
+            if other is self or other.entered_door:
+                continue
+            other_rect = other.rect()
+            if swept_collides(player_rect, previous_rect, other_rect, move_x):
                 if move_x > 0:
                     # 오른쪽으로 이동 중 충돌 → 왼쪽으로 밀어냄
-                    self.x = other.rect().left - self.w
+                    self.x = other_rect.left - self.w
                 elif move_x < 0:
                     # 왼쪽으로 이동 중 충돌 → 오른쪽으로 밀어냄
-                    self.x = other.rect().right
+                    self.x = other_rect.right
                 player_rect = self.rect()
 
         try:
@@ -119,15 +191,15 @@ class Player:
         except (IndexError, TypeError):
             pass
 
-        self.vel_y += GRAVITY
-        move_y = self.vel_y
+        self.vel_y, move_y = apply_gravity(self.vel_y, dt)
+        previous_rect = self.rect()
         self.y += move_y
 
         player_rect = self.rect()
         self.on_ground = False
         # 플랫폼 충돌 처리
-        for platform in platforms:
-            if player_rect.colliderect(platform):
+        for platform in nearby_platforms(platforms, player_rect.union(previous_rect)):
+            if swept_collides(player_rect, previous_rect, platform, 0, move_y):
                 if move_y > 0:
                     self.y = platform.top - self.h
                     self.vel_y = 0
@@ -152,15 +224,18 @@ class Player:
         
         # 다른 플레이어와의 Y축 충돌 처리 (문 안으로 들어간 플레이어는 제외)
         for other in other_players:
-            if other is not self and not other.entered_door and player_rect.colliderect(other.rect()):
+            if other is self or other.entered_door:
+                continue
+            other_rect = other.rect()
+            if swept_collides(player_rect, previous_rect, other_rect, 0, move_y):
                 if move_y > 0:
                     # 아래로 떨어지는 중 충돌 → 위로 밀어냄
-                    self.y = other.rect().top - self.h
+                    self.y = other_rect.top - self.h
                     self.vel_y = 0
                     self.on_ground = True
                 elif move_y < 0:
                     # 위로 이동 중 충돌 → 아래로 밀어냄
-                    self.y = other.rect().bottom
+                    self.y = other_rect.bottom
                     self.vel_y = 0
                 player_rect = self.rect()
 
@@ -168,71 +243,20 @@ class Player:
         self.y = min(self.y, HEIGHT - self.h)
 
     def draw(self, surface):
-        """플레이어 디자인"""
-        x = int(self.x)
-        y = int(self.y)
-        w = self.w
-        h = self.h
-        
-        # 머리 부분 (원형)
-        head_radius = w // 2
-        head_center_x = x + w // 2
-        head_center_y = y + head_radius
-        
-        # 머리 원 그리기
-        pygame.draw.circle(surface, self.color, (head_center_x, head_center_y), head_radius)
-        
-        # 몸통 부분 (아래쪽 파도 모양)
-        body_height = h - head_radius
-        body_top_y = head_center_y
-        body_bottom_y = y + h
-        
-        # 몸통의 기본 사각형
-        body_rect = pygame.Rect(x, body_top_y, w, body_height)
-        pygame.draw.rect(surface, self.color, body_rect)
-        
-        # 아래쪽 파도 모양 만들기 (3개의 작은 반원)
-        wave_count = 3
-        wave_width = w // wave_count
-        wave_height = 8  # 파도의 깊이
-        
-        for i in range(wave_count + 1):  # +1은 오른쪽 끝을 위해
-            wave_x = x + i * wave_width
-            # 각 파도는 작은 반원으로 표현
-            if i < wave_count:
-                # 파도가 들어가는 부분 (사각형으로 제거)
-                wave_rect = pygame.Rect(wave_x, body_bottom_y - wave_height, wave_width, wave_height * 2)
-                # 배경색으로 덮어서 파도 모양 만들기
-                # 대신 작은 원을 그려서 파도 모양 표현
-                wave_center_x = wave_x + wave_width // 2
-                wave_center_y = body_bottom_y
-                # 반원을 그리기 위해 작은 원을 그리고 위쪽을 덮기
-                pygame.draw.circle(surface, self.color, (wave_center_x, wave_center_y), wave_width // 2)
-        
-        # 파도 모양을 더 명확하게 만들기 위해 아래쪽을 다시 그립니다
-        # 각 파도 사이의 공간을 제거하여 파도 모양 완성
-        for i in range(wave_count):
-            wave_x = x + i * wave_width + wave_width // 2
-            wave_center_y = body_bottom_y
-            # 작은 반원을 그려서 파도 모양 만들기
-            pygame.draw.circle(surface, self.color, (wave_x, wave_center_y), wave_width // 2)
-        
-        # 눈 그리기 (작은 원 2개)
-        eye_size = 4
-        left_eye_x = head_center_x - head_radius // 2
-        right_eye_x = head_center_x + head_radius // 2
-        eye_y = head_center_y - head_radius // 3
-        pygame.draw.circle(surface, (0, 0, 0), (left_eye_x, eye_y), eye_size)
-        pygame.draw.circle(surface, (0, 0, 0), (right_eye_x, eye_y), eye_size)
-        
-        if self.has_key:
-            pygame.draw.rect(
-                surface, (255, 215, 0), (int(self.x + self.w + 6), int(self.y + 12), 18, 18)
-            )
+        """플레이어 디자인 (미리 그려둔 스프라이트를 blit)"""
+        sprite_cache.draw(surface, int(self.x), int(self.y), self.color, self.w, self.h,
+                          STYLE_PLAYER, self.has_key)
 
+    def draw_rect(self):
+        """draw()가 그리는 영역 (열쇠 표시 포함)"""
+        sprite = sprite_cache.get(self.color, self.w, self.h, STYLE_PLAYER, self.has_key)
+        return sprite.get_rect(topleft=(int(self.x), int(self.y)))
+
+class KeyObj(CachedRect):
+    __slots__ = ("x", "y", "w", "h", "collected", "attached_to_player")
 
-class KeyObj:
     def __init__(self, x=520, y=340):
+        super().__init__()
         self.x = x
         self.y = y
         self.w = 18
@@ -240,41 +264,43 @@ class KeyObj:
         self.collected = False
         self.attached_to_player = False
 
-    def rect(self):
-        return pygame.Rect(self.x, self.y, self.w, self.h)
-
     def draw(self, surface):
         if self.collected:
             return
-        pygame.draw.rect(surface, (255, 215, 0), (self.x, self.y, self.w, self.h))
+        draw_rect(surface, (255, 215, 0), (self.x, self.y, self.w, self.h))
+
+    def draw_rect(self):
+        """draw()가 그리는 영역"""
+        return pygame.Rect(self.x, self.y, self.w, self.h)
 
     def update(self, players):
         """players는 Player 객체의 리스트"""
         if self.collected:
             return
+        key_rect = self.rect()
         for player in players:
-            if self.rect().colliderect(player.rect()):
+            if key_rect.colliderect(player.rect()):
                 self.collected = True
                 player.has_key = True
                 self.attached_to_player = True
                 break
 
 
-class Door:
+class Door(CachedRect):
+    __slots__ = ("x", "y", "w", "h", "open")
+
     def __init__(self, x=760, y=240):
+        super().__init__()
         self.x = x
         self.y = y
         self.w = 48
         self.h = 96
         self.open = False
 
-    def rect(self):
-        return pygame.Rect(self.x, self.y, self.w, self.h)
-
     def draw(self, surface, font):
         # 문 프레임 (어두운 갈색)
         frame_color = (80, 50, 30)
-        pygame.draw.rect(surface, frame_color, (self.x - 4, self.y - 4, self.w + 8, self.h + 8))
+        draw_rect(surface, frame_color, (self.x - 4, self.y - 4, self.w + 8, self.h + 8))
         
         # 문 본체 색상
         if self.open:
@@ -282,31 +308,36 @@ class Door:
         else:
             door_color = (150, 90, 60)  # 닫힌 문: 갈색
         
-        pygame.draw.rect(surface, door_color, (self.x, self.y, self.w, self.h))
+        draw_rect(surface, door_color, (self.x, self.y, self.w, self.h))
         
         # 문 손잡이
         handle_x = self.x + self.w - 12 if self.open else self.x + 8
         handle_y = self.y + self.h // 2
-        pygame.draw.circle(surface, (200, 200, 200), (handle_x, handle_y), 4)
-        pygame.draw.circle(surface, (100, 100, 100), (handle_x, handle_y), 4, 1)
+        draw_circle(surface, (200, 200, 200), (handle_x, handle_y), 4)
+        draw_circle(surface, (100, 100, 100), (handle_x, handle_y), 4, 1)
         
         # 문 패널 디테일 (수직선)
         for i in range(2):
             line_x = self.x + (i + 1) * (self.w // 3)
-            pygame.draw.line(surface, (100, 60, 40), (line_x, self.y + 8), (line_x, self.y + self.h - 8), 2)
+            draw_line(surface, (100, 60, 40), (line_x, self.y + 8), (line_x, self.y + self.h - 8), 2)
         
         # 문 가로선 디테일
         for i in range(2):
             line_y = self.y + (i + 1) * (self.h // 3)
-            pygame.draw.line(surface, (100, 60, 40), (self.x + 8, line_y), (self.x + self.w - 8, line_y), 2)
+            draw_line(surface, (100, 60, 40), (self.x + 8, line_y), (self.x + self.w - 8, line_y), 2)
         
         # 문 테두리
-        pygame.draw.rect(surface, (0, 0, 0), (self.x, self.y, self.w, self.h), 2)
+        draw_rect(surface, (0, 0, 0), (self.x, self.y, self.w, self.h), 2)
+
+    def draw_rect(self):
+        """draw()가 그리는 영역 (문 프레임 포함)"""
+        return pygame.Rect(self.x - 4, self.y - 4, self.w + 8, self.h + 8)
 
     def update(self, players):
         """players는 Player 객체의 리스트"""
+        door_rect = self.rect()
         for player in players:
-            if self.rect().colliderect(player.rect()):
+            if door_rect.colliderect(player.rect()):
                 if player.has_key and not self.open:
                     self.open = True
                     player.has_key = False
@@ -319,7 +350,6 @@ class Door:
         for player in players:
             if door_rect.colliderect(player.rect()):
                 # SyncedPlayer인 경우 모든 플레이어의 상호작용 키를 확인
-                from entities import SyncedPlayer
                 if isinstance(player, SyncedPlayer):
                     # 4스테이지: 모든 플레이어가 같은 상호작용 키를 눌러야 함
                     # DOWN, S, K 키 중 하나라도 누르면 상호작용
@@ -354,9 +384,12 @@ class Door:
             player.entered_door = False
 
 
-class MovableWall:
+class MovableWall(CachedRect):
     """밀 수 있는 벽"""
+    __slots__ = ("x", "y", "w", "h", "required_players", "move_direction", "min_x", "max_x", "speed")
+
     def __init__(self, x, y, width, height, required_players=1, move_direction="right", min_x=None, max_x=None):
+        super().__init__()
         self.x = float(x)
         self.y = float(y)
         self.w = width
@@ -366,9 +399,6 @@ class MovableWall:
         self.min_x = min_x if min_x is not None else 0
         self.max_x = max_x if max_x is not None else WIDTH
         self.speed = 4  # 벽 이동 속도 (플레이어 속도와 동일)
-        
-    def rect(self):
-        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
     
     def update(self, players, keys, active_players_count=None):
         """플레이어들이 벽을 밀고 있는지 확인하고 이동"""
@@ -426,8 +456,8 @@ class MovableWall:
     
     def draw(self, surface, font=None, active_players_count=None):
         """벽 그리기"""
-        pygame.draw.rect(surface, (100, 100, 100), (int(self.x), int(self.y), self.w, self.h))
-        pygame.draw.rect(surface, (0, 0, 0), (int(self.x), int(self.y), self.w, self.h), 2)
+        draw_rect(surface, (100, 100, 100), (int(self.x), int(self.y), self.w, self.h))
+        draw_rect(surface, (0, 0, 0), (int(self.x), int(self.y), self.w, self.h), 2)
         
         # 필요한 플레이어 수 표시
         if font:
@@ -438,16 +468,23 @@ class MovableWall:
             else:
                 text = f"{self.required_players}"
             
-            text_surface = font.render(text, True, (255, 255, 255))
+            text_surface = render_text(font, text, (255, 255, 255))
             # 벽 중앙에 텍스트 표시
             text_x = int(self.x + self.w / 2 - text_surface.get_width() / 2)
             text_y = int(self.y + self.h / 2 - text_surface.get_height() / 2)
             surface.blit(text_surface, (text_x, text_y))
 
 
-class MovingPlatform:
-    """움직이는 발판 클래스"""
+class MovingPlatform(CachedRect):
+    """움직이는 발판 클래스
+
+    위치는 시작한 뒤 지난 틱 수(phase)의 함수(삼각파)로 계산하므로 아무 틱으로나 바로 이동(seek)할 수 있다.
+    """
+    __slots__ = ("x", "y", "w", "h", "min_y", "max_y", "speed", "direction", "start_y", "last_y",
+                 "phase", "last_phase", "start_direction", "first_leg_ticks", "leg_ticks")
+
     def __init__(self, x, y, w, h, min_y, max_y, speed=2):
+        super().__init__()
         self.x = float(x)
         self.y = float(y)
         self.w = w
@@ -462,39 +499,73 @@ class MovingPlatform:
             self.direction = 1  # 아래로 시작 (y 증가)
         self.start_y = float(y)
         self.last_y = float(y)  # 이전 프레임의 Y 위치
-    
-    def rect(self):
-        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
-    
-    def update(self):
+        self.start_direction = self.direction
+        # 처음 한계에 닿을 때까지의 틱 수, 이후 한계에서 반대쪽 한계까지의 틱 수
+        # (한 틱에 speed씩 움직이다 한계를 넘는 틱에 한계 위치로 맞추므로 올림)
+        first_distance = self.start_y - max_y if self.direction == -1 else min_y - self.start_y
+        self.first_leg_ticks = math.ceil(first_distance / speed) if speed > 0 else 0
+        self.leg_ticks = math.ceil((min_y - max_y) / speed) if speed > 0 else 0
+        self.phase = 0  # 시작한 뒤 지난 틱 수 (60Hz 틱 단위)
+        self.last_phase = 0
+
+    def state_at(self, phase):
+        """phase틱 후의 (y, 방향)"""
+        if self.speed <= 0 or self.leg_ticks <= 0:
+            return self.start_y, self.start_direction
+        if phase < self.first_leg_ticks:
+            return self.start_y + self.start_direction * self.speed * phase, self.start_direction
+        # 첫 번째로 닿은 한계에서부터 leg_ticks마다 방향을 바꾸며 왕복
+        legs, offset = divmod(phase - self.first_leg_ticks, self.leg_ticks)
+        if legs % 2 == 0:
+            direction = -self.start_direction
+        else:
+            direction = self.start_direction
+        bound = self.min_y if direction == -1 else self.max_y
+        if offset == 0:
+            return bound, direction
+        # dt가 정수가 아니면 한계를 넘을 수 있으므로 이동 거리를 범위로 제한
+        return bound + direction * min(self.speed * offset, self.min_y - self.max_y), direction
+
+    def periodic_phase(self, phase):
+        """phase와 같은 상태인 가장 작은 phase (첫 한계에 닿은 뒤로는 왕복 한 번(leg_ticks * 2)마다 같은 상태)"""
+        if self.speed <= 0 or self.leg_ticks <= 0:
+            return 0
+        if phase < self.first_leg_ticks:
+            return phase
+        return self.first_leg_ticks + (phase - self.first_leg_ticks) % (2 * self.leg_ticks)
+
+    def seek(self, phase, last_phase=None):
+        """phase틱 상태로 바로 이동 (last_phase는 get_movement_delta 계산용 이전 틱)"""
+        self.phase = phase
+        self.last_phase = phase if last_phase is None else last_phase
+        self.y, self.direction = self.state_at(phase)
+        self.last_y = self.state_at(self.last_phase)[0]
+
+    def update(self, dt=1):
         """발판 이동 업데이트"""
-        self.last_y = self.y  # 이전 위치 저장
-        self.y += self.speed * self.direction
-        
-        # Y 좌표계: 위쪽이 작은 값, 아래쪽이 큰 값
-        # max_y는 위쪽(작은 값), min_y는 아래쪽(큰 값)
-        if self.direction == 1:  # 아래로 이동 중 (y 증가)
-            if self.y >= self.min_y:  # 아래쪽 한계에 도달
-                self.y = self.min_y
-                self.direction = -1  # 위로 방향 전환
-        else:  # 위로 이동 중 (y 감소)
-            if self.y <= self.max_y:  # 위쪽 한계에 도달
-                self.y = self.max_y
-                self.direction = 1  # 아래로 방향 전환
-    
+        self.seek(self.phase + dt, self.phase)
+
     def get_movement_delta(self):
         """이번 프레임에서 발판이 이동한 거리 반환"""
         return self.y - self.last_y
     
     def draw(self, surface):
         """발판 그리기"""
-        pygame.draw.rect(surface, (150, 150, 150), (int(self.x), int(self.y), self.w, self.h))
-        pygame.draw.rect(surface, (0, 0, 0), (int(self.x), int(self.y), self.w, self.h), 2)
+        draw_rect(surface, (150, 150, 150), (int(self.x), int(self.y), self.w, self.h))
+        draw_rect(surface, (0, 0, 0), (int(self.x), int(self.y), self.w, self.h), 2)
+
+    def draw_rect(self):
+        """draw()가 그리는 영역"""
+        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
 
 
-class SyncedPlayer:
+class SyncedPlayer(CachedRect):
     """4스테이지용 동기화된 플레이어 (모든 플레이어가 같은 입력을 해야 움직임)"""
+    __slots__ = ("x", "y", "w", "h", "vel_y", "on_ground", "has_key", "speed", "color",
+                 "interacted_with_door", "entered_door")
+
     def __init__(self, x=100, y=300, color=(30, 120, 255)):
+        super().__init__()
         self.x = float(x)
         self.y = float(y)
         self.w = 40
@@ -507,10 +578,7 @@ class SyncedPlayer:
         self.interacted_with_door = False
         self.entered_door = False
     
-    def rect(self):
-        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
-    
-    def update(self, keys, platforms, other_platforms=None, all_players_keys=None):
+    def update(self, keys, platforms, other_platforms=None, all_players_keys=None, dt=1):
         """모든 플레이어가 같은 입력을 했을 때만 움직임"""
         if other_platforms is None:
             other_platforms = []
@@ -542,14 +610,15 @@ class SyncedPlayer:
             move_dir = -1
         elif all_right and not all_left:
             move_dir = 1
-        move_x = move_dir * self.speed
+        move_x = move_dir * self.speed * dt
+        previous_rect = self.rect()
         self.x += move_x
         
-        # 플랫폼 충돌 처리
+        # 플랫폼 충돌 처리 (platforms가 공간 격자면 움직이는 발판도 격자에 들어있음)
         player_rect = self.rect()
-        all_platforms = platforms + other_platforms
-        for platform in all_platforms:
-            if player_rect.colliderect(platform):
+        all_platforms = platforms + other_platforms if other_platforms else platforms
+        for platform in nearby_platforms(all_platforms, player_rect.union(previous_rect)):
+            if swept_collides(player_rect, previous_rect, platform, move_x):
                 if move_x > 0:
                     self.x = platform.left - self.w
                 elif move_x < 0:
@@ -562,15 +631,15 @@ class SyncedPlayer:
             self.on_ground = False
         
         # 중력 적용
-        self.vel_y += GRAVITY
-        move_y = self.vel_y
+        self.vel_y, move_y = apply_gravity(self.vel_y, dt)
+        previous_rect = self.rect()
         self.y += move_y
         
         # 플랫폼 충돌 처리
         player_rect = self.rect()
         self.on_ground = False
-        for platform in all_platforms:
-            if player_rect.colliderect(platform):
+        for platform in nearby_platforms(all_platforms, player_rect.union(previous_rect)):
+            if swept_collides(player_rect, previous_rect, platform, 0, move_y):
                 if move_y > 0:
                     self.y = platform.top - self.h
                     self.vel_y = 0
@@ -584,68 +653,33 @@ class SyncedPlayer:
         self.y = min(self.y, HEIGHT - self.h)
     
     def draw(self, surface):
-        """유령 모양으로 플레이어 그리기"""
-        x = int(self.x)
-        y = int(self.y)
-        w = self.w
-        h = self.h
-        
-        # 머리 부분 (원형)
-        head_radius = w // 2
-        head_center_x = x + w // 2
-        head_center_y = y + head_radius
-        
-        # 머리 원 그리기
-        pygame.draw.circle(surface, self.color, (head_center_x, head_center_y), head_radius)
-        
-        # 몸통 부분 (아래쪽 파도 모양)
-        body_height = h - head_radius
-        body_top_y = head_center_y
-        body_bottom_y = y + h
-        
-        # 몸통의 기본 사각형
-        body_rect = pygame.Rect(x, body_top_y, w, body_height)
-        pygame.draw.rect(surface, self.color, body_rect)
-        
-        # 아래쪽 파도 모양 만들기 (3개의 작은 반원으로 파도 효과)
-        wave_count = 3
-        wave_width = w // wave_count
-        
-        # 각 파도 위치에 작은 원을 그려서 파도 모양 만들기
-        for i in range(wave_count):
-            wave_center_x = x + i * wave_width + wave_width // 2
-            wave_center_y = body_bottom_y
-            wave_radius = wave_width // 2
-            
-            # 작은 원을 그려서 파도 모양 표현
-            pygame.draw.circle(surface, self.color, (wave_center_x, wave_center_y), wave_radius)
-        
-        # 파도 사이의 공간을 채우기 위해 아래쪽에 사각형 추가
-        wave_fill_rect = pygame.Rect(x, body_bottom_y - wave_width // 2, w, wave_width // 2)
-        pygame.draw.rect(surface, self.color, wave_fill_rect)
-        
-        # 눈 그리기 (작은 원 2개)
-        eye_size = 4
-        left_eye_x = head_center_x - head_radius // 2
-        right_eye_x = head_center_x + head_radius // 2
-        eye_y = head_center_y - head_radius // 3
-        pygame.draw.circle(surface, (0, 0, 0), (left_eye_x, eye_y), eye_size)
-        pygame.draw.circle(surface, (0, 0, 0), (right_eye_x, eye_y), eye_size)
-        
-        if self.has_key:
-            pygame.draw.rect(surface, (255, 215, 0), (int(self.x + self.w + 6), int(self.y + 12), 18, 18))
+        """유령 모양으로 플레이어 그리기 (미리 그려둔 스프라이트를 blit)"""
+        sprite_cache.draw(surface, int(self.x), int(self.y), self.color, self.w, self.h,
+                          STYLE_SYNCED, self.has_key)
 
+    def draw_rect(self):
+        """draw()가 그리는 영역 (열쇠 표시 포함)"""
+        sprite = sprite_cache.get(self.color, self.w, self.h, STYLE_SYNCED, self.has_key)
+        return sprite.get_rect(topleft=(int(self.x), int(self.y)))
 
-class Spike:
+class Spike(CachedRect):
     """가시 클래스 - 플레이어가 닿으면 게임 오버"""
+    __slots__ = ("x", "y", "w", "h")
+
     def __init__(self, x, y, width):
+        super().__init__()
         self.x = x
         self.y = y
-        self.width = width
-        self.height = 20
-    
-    def rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.w = width
+        self.h = 20
+
+    @property
+    def width(self):
+        return self.w
+
+    @property
+    def height(self):
+        return self.h
     
     def draw(self, surface):
         """가시 그리기 (삼각형 모양)"""
@@ -661,8 +695,8 @@ class Spike:
                 (spike_x, self.y + self.height),
                 (spike_x + 20, self.y + self.height)
             ]
-            pygame.draw.polygon(surface, color, points)
-            pygame.draw.polygon(surface, (150, 0, 0), points, 2)
+            draw_polygon(surface, color, points)
+            draw_polygon(surface, (150, 0, 0), points, 2)
     
     def check_collision(self, players):
         """플레이어와 충돌 확인"""
@@ -673,9 +707,12 @@ class Spike:
         return False
 
 
-class FloorButton:
+class FloorButton(CachedRect):
     """바닥을 생성하는 버튼"""
+    __slots__ = ("x", "y", "w", "h", "pressed", "color")
+
     def __init__(self, x, y):
+        super().__init__()
         self.x = x
         self.y = y
         self.w = 60
@@ -683,21 +720,23 @@ class FloorButton:
         self.pressed = False
         self.color = (100, 200, 100)  # 초록색
     
-    def rect(self):
-        return pygame.Rect(self.x, self.y, self.w, self.h)
-    
     def draw(self, surface, font):
         """버튼 그리기"""
         if self.pressed:
             color = (60, 150, 60)  # 눌린 상태: 더 어두운 초록색
         else:
             color = self.color
-        pygame.draw.rect(surface, color, (self.x, self.y, self.w, self.h))
-        pygame.draw.rect(surface, (0, 0, 0), (self.x, self.y, self.w, self.h), 2)
+        draw_rect(surface, color, (self.x, self.y, self.w, self.h))
+        draw_rect(surface, (0, 0, 0), (self.x, self.y, self.w, self.h), 2)
         
         # 버튼 텍스트
-        label = font.render("Button", True, (0, 0, 0))
+        label = render_text(font, "Button", (0, 0, 0))
         surface.blit(label, (self.x + 5, self.y - 25))
+
+    def draw_rect(self, font):
+        """draw()가 그리는 영역 (위쪽 글자 포함)"""
+        label_rect = pygame.Rect((self.x + 5, self.y - 25), font.size("Button"))
+        return pygame.Rect(self.x, self.y, self.w, self.h).union(label_rect)
     
     def update(self, players):
         """플레이어가 버튼을 눌렀는지 확인"""
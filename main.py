@@ -1,12 +1,21 @@
 import sys
 import os
+import io
+import argparse
 import math
+import time
 import pygame
 
 from config import WIDTH, HEIGHT, TITLE, FPS, BACKGROUND_COLOR, MAX_STAGE, PICO_TEXT_COLOR, PICO_FLOOR_COLOR
-from stages import create_stage_objects
-from ui import Button, Slider, draw_text_center
-from sound_manager import init_sound_manager
+from config import RECORD_REPLAYS, REPLAY_DIR, SIM_TICK_RATE, DIRTY_RECT_RENDERING, IDLE_TIMEOUT_MS, HEADLESS
+from simulation import World, TICK_RATE, EVENT_KEY_COLLECTED, EVENT_DOOR_OPENED
+from replay import InputRecorder
+from assets import AssetLoader, read_file
+from sprites import sprite_cache, STYLE_PREVIEW
+from canvas import draw_rect, mouse_pos, to_game_coords
+from renderer import StaticLayer, DirtyRectRenderer, create_display, draw_static_scene, init_display
+from ui import Button, Slider, draw_text_center, render_text, surface_cache
+from sound_manager import init_sound_manager, BGM_MENU, BGM_GAME, BGM_CLEAR
 
 
 STATE_MAIN = "main"
@@ -19,6 +28,13 @@ STATE_CLEAR = "clear"
 STATE_SETTINGS = "settings"  # 메뉴에서 들어온 설정 창
 STATE_PAUSE = "pause"  # 게임 중 ESC로 들어온 일시정지 창
 
+# 움직이는 것이 없는 화면: 입력이 있거나 버튼 hover 상태가 바뀔 때만 다시 그림
+IDLE_STATES = {STATE_MAIN, STATE_MENU, STATE_SELECT_PLAYER_COUNT, STATE_CUSTOMIZE_PLAYERS,
+               STATE_STAGE_SELECT, STATE_CLEAR, STATE_SETTINGS, STATE_PAUSE}
+
+# 한 프레임에 따라잡을 최대 틱 수 (프레임이 크게 밀렸을 때 무한히 따라잡지 않도록)
+MAX_TICKS_PER_FRAME = 5
+
 
 def create_stage_buttons(total_stages):
     buttons = []
@@ -58,21 +74,35 @@ def initialize_sliders():
     return Slider(320, 240, 360, start=0.6), Slider(320, 340, 360, start=0.5)
 
 
-def get_korean_font(size):
-    """한글 폰트 로드 (DungGeunMo.ttf)"""
+def find_korean_fonts():
+    """한글 폰트 파일 (DungGeunMo.ttf) 경로 리스트 (있는 것만)"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     fonts_dirs = [
         os.path.join(script_dir, "fonts"),
         os.path.join(os.path.dirname(script_dir), "fonts")
     ]
-    
-    for fonts_dir in fonts_dirs:
-        font_path = os.path.join(fonts_dir, "DungGeunMo.ttf")
-        if os.path.exists(font_path):
-            try:
-                return pygame.font.Font(font_path, size)
-            except:
-                continue
+    font_paths = [os.path.join(fonts_dir, "DungGeunMo.ttf") for fonts_dir in fonts_dirs]
+    return [font_path for font_path in font_paths if os.path.exists(font_path)]
+
+
+def read_korean_font():
+    """한글 폰트 파일 내용 (작업 스레드에서 미리 읽어둘 때 사용, 없으면 None)"""
+    for font_path in find_korean_fonts():
+        try:
+            return read_file(font_path)
+        except OSError:
+            continue
+    return None
+
+
+def get_korean_font(size, font_data=None):
+    """한글 폰트 로드 (DungGeunMo.ttf). font_data는 read_korean_font로 미리 읽어둔 파일 내용"""
+    sources = [io.BytesIO(font_data)] if font_data is not None else find_korean_fonts()
+    for source in sources:
+        try:
+            return pygame.font.Font(source, size)
+        except:
+            continue
     
     return pygame.font.Font(None, size)
 
@@ -94,11 +124,21 @@ def restore_slider_positions(sound_slider, sfx_slider, slider_orig_positions):
 
 
 def create_overlay(width, height, alpha):
-    """반투명 오버레이 생성"""
-    overlay = pygame.Surface((width, height))
-    overlay.set_alpha(alpha)
-    overlay.fill((0, 0, 0))
-    return overlay
+    """반투명 오버레이 (크기와 투명도별로 한 번만 만들어 재사용하므로 수정하지 말 것)"""
+    return surface_cache.overlay((width, height), alpha)
+
+
+def wait_for_events(timeout_ms):
+    """이벤트가 올 때까지 최대 timeout_ms 동안 기다렸다가 쌓인 이벤트 리스트 반환 (시간 초과면 빈 리스트)"""
+    event = pygame.event.wait(timeout_ms)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+def button_hover_state(all_buttons, pos):
+    """버튼마다 마우스가 올라가 있는지 (hover 색상이 바뀌었는지 비교용)"""
+    return tuple(button.rect.collidepoint(pos) for button in all_buttons)
 
 
 def draw_grass_background(screen):
@@ -107,54 +147,12 @@ def draw_grass_background(screen):
     floor_y = HEIGHT - floor_height
     
     # 단순한 바닥 (인게임 플랫폼과 동일한 스타일)
-    pygame.draw.rect(screen, PICO_FLOOR_COLOR, (0, floor_y, WIDTH, floor_height))
+    draw_rect(screen, PICO_FLOOR_COLOR, (0, floor_y, WIDTH, floor_height))
 
 
 def draw_character_preview(surface, x, y, size, color):
-    """캐릭터 미리보기 그리기 (Player.draw() 스타일)"""
-    w = size
-    h = int(size * 1.4)  # 실제 플레이어 비율 (40x56)
-    
-    # 머리 부분 (원형)
-    head_radius = w // 2
-    head_center_x = x + w // 2
-    head_center_y = y + head_radius
-    
-    # 머리 원 그리기
-    pygame.draw.circle(surface, color, (head_center_x, head_center_y), head_radius)
-    
-    # 몸통 부분 (아래쪽 파도 모양)
-    body_height = h - head_radius
-    body_top_y = head_center_y
-    body_bottom_y = y + h
-    
-    # 몸통의 기본 사각형
-    body_rect = pygame.Rect(x, body_top_y, w, body_height)
-    pygame.draw.rect(surface, color, body_rect)
-    
-    # 아래쪽 파도 모양 만들기 (3개의 작은 반원)
-    wave_count = 3
-    wave_width = w // wave_count
-    
-    # 각 파도 위치에 작은 원을 그려서 파도 모양 만들기
-    for i in range(wave_count):
-        wave_center_x = x + i * wave_width + wave_width // 2
-        wave_center_y = body_bottom_y
-        wave_radius = wave_width // 2
-        pygame.draw.circle(surface, color, (wave_center_x, wave_center_y), wave_radius)
-    
-    # 파도 사이의 공간을 채우기 위해 아래쪽에 사각형 추가
-    wave_fill_rect = pygame.Rect(x, body_bottom_y - wave_width // 2, w, wave_width // 2)
-    pygame.draw.rect(surface, color, wave_fill_rect)
-    
-    # 눈 그리기 (작은 원 2개)
-    eye_size = 3
-    left_eye_x = head_center_x - head_radius // 2
-    right_eye_x = head_center_x + head_radius // 2
-    eye_y = head_center_y - head_radius // 3
-    pygame.draw.circle(surface, (0, 0, 0), (left_eye_x, eye_y), eye_size)
-    pygame.draw.circle(surface, (0, 0, 0), (right_eye_x, eye_y), eye_size)
-
+    """캐릭터 미리보기 그리기 (Player.draw() 스타일, 미리 그려둔 스프라이트를 blit)"""
+    sprite_cache.draw(surface, x, y, color, size, int(size * 1.4), STYLE_PREVIEW)  # 실제 플레이어 비율 (40x56)
 
 def draw_confirm_popup(screen, font, korean_font, buttons, message):
     """확인 팝업 그리기"""
@@ -164,8 +162,8 @@ def draw_confirm_popup(screen, font, korean_font, buttons, message):
     
     # 팝업 창 배경
     popup_rect = pygame.Rect(280, 250, 400, 200)
-    pygame.draw.rect(screen, (240, 240, 240), popup_rect)
-    pygame.draw.rect(screen, (0, 0, 0), popup_rect, 3)
+    draw_rect(screen, (240, 240, 240), popup_rect)
+    draw_rect(screen, (0, 0, 0), popup_rect, 3)
     
     # 메시지 표시
     draw_text_center(screen, message, font, PICO_TEXT_COLOR, WIDTH // 2, 290, korean_font)
@@ -175,24 +173,157 @@ def draw_confirm_popup(screen, font, korean_font, buttons, message):
     buttons["exit_no"].draw(screen, font)
 
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+def save_replay(recorder):
+    """기록 중인 입력 리플레이를 REPLAY_DIR에 저장 (기록이 없으면 무시)"""
+    if recorder is None or recorder.ticks == 0:
+        return
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    replay_dir = os.path.join(script_dir, REPLAY_DIR)
+    os.makedirs(replay_dir, exist_ok=True)
+    filename = f"stage{recorder.stage}_{recorder.player_count}p_{time.strftime('%Y%m%d_%H%M%S')}.dndr"
+    try:
+        recorder.save(os.path.join(replay_dir, filename))
+    except OSError:
+        pass
+
+
+def game_scene_labels(world, font, show_hint=False):
+    """게임 화면에 표시할 글자. (힌트 (글자, 위치) 또는 None, [(글자, 위치)]) 반환"""
+    # 문이 열려있고 일부 플레이어만 상호작용한 경우 힌트 표시
+    hint = None
+    if show_hint and world.door_obj.open and world.players_at_door():
+        interacted_count = sum(1 for p in world.active_players if p.interacted_with_door)
+        total_count = len(world.active_players)
+        hint_text = f"Press \"Down keys\" to enter ({interacted_count}/{total_count})"
+        hint = (hint_text, (world.door_obj.x - 320, world.door_obj.y - 60))
+
+    labels = []
+    # 1스테이지: 조작키 설명 표시
+    if world.stage == 1:
+        controls_text = [
+            "Player 1: Arrow Keys",
+            "Player 2: WASD (W/A/S/D)",
+            "Player 3: IJKL (I/J/K/L)"
+        ]
+        y_offset = 50
+        for i, text in enumerate(controls_text):
+            if i < world.player_count:
+                labels.append((text, (10, y_offset + i * 30)))
+
+    # 4스테이지, 6스테이지: 동기화 메시지 표시
+    if world.synced:
+        sync_message = "All players must input the same action to move!"
+        # 화면 상단 중앙에 표시
+        message_x = (WIDTH - font.size(sync_message)[0]) // 2
+        labels.append((sync_message, (message_x, 50)))
+
+    stage_text = f"Stage {world.stage}"
+    labels.append((stage_text, (WIDTH - font.size(stage_text)[0] - 12, 12)))
+    return hint, labels
+
+
+def draw_dynamic_scene(screen, world, font, hint, labels):
+    """고정 레이어 위에 움직이거나 상태가 바뀌는 오브젝트와 글자 그리기"""
+    if hint is not None:
+        screen.blit(render_text(font, hint[0], PICO_TEXT_COLOR), hint[1])
+
+    # 움직이는 발판 렌더링
+    for platform in world.moving_platforms:
+        platform.draw(screen)
+
+    if world.floor_button is not None:
+        world.floor_button.draw(screen, font)
+
+    # 플레이어 렌더링 (문 안으로 들어간 플레이어는 먼저 그리기)
+    for player in world.active_players:
+        if player.entered_door:
+            player.draw(screen)
+    for player in world.active_players:
+        if not player.entered_door:
+            player.draw(screen)
+    world.key_obj.draw(screen)
+    world.door_obj.draw(screen, font)
+
+    for text, position in labels:
+        screen.blit(render_text(font, text, PICO_TEXT_COLOR), position)
+
+
+def game_scene_items(world, font, hint, labels):
+    """DirtyRectRenderer에 넘길 동적 오브젝트 목록 [(모양 상태, 그리는 영역)] (매 프레임 같은 순서)"""
+    if hint is not None:
+        items = [(hint[0], pygame.Rect(hint[1], font.size(hint[0])))]
+    else:
+        items = [(None, pygame.Rect(0, 0, 0, 0))]
+    items.extend(((), platform.draw_rect()) for platform in world.moving_platforms)
+    if world.floor_button is not None:
+        items.append((world.floor_button.pressed, world.floor_button.draw_rect(font)))
+    items.extend(((player.entered_door, player.has_key, player.color), player.draw_rect())
+                 for player in world.active_players)
+    items.append((world.key_obj.collected, world.key_obj.draw_rect()))
+    items.append((world.door_obj.open, world.door_obj.draw_rect()))
+    items.extend((text, pygame.Rect(position, font.size(text))) for text, position in labels)
+    return items
+
+
+def draw_game_scene(screen, world, font, show_hint=False, static_layer=None, dirty_renderer=None):
+    """게임 화면 그리기 (World 상태를 읽기만 함)
+
+    static_layer(StaticLayer)를 주면 배경과 고정 플랫폼, 가시를 한 번에 blit하고,
+    없으면 이미 배경을 칠한 screen 위에 직접 그린다. dirty_renderer(DirtyRectRenderer)를 주면
+    바뀐 영역만 다시 그리고 pygame.display.update()에 넘길 Rect 리스트를 반환한다 (아니면 None).
+    """
+    hint, labels = game_scene_labels(world, font, show_hint)
+
+    def draw_dynamic(surface):
+        draw_dynamic_scene(surface, world, font, hint, labels)
+
+    if dirty_renderer is not None:
+        return dirty_renderer.draw(screen, world, game_scene_items(world, font, hint, labels), draw_dynamic)
+    if static_layer is not None:
+        static_layer.draw(screen, world)
+    else:
+        draw_static_scene(screen, world)
+    draw_dynamic(screen)
+    return None
+
+def draw_loading_progress(screen, assets, y):
+    """백그라운드 에셋 로드 진행률 막대 (다 읽었으면 그리지 않음)"""
+    done, total = assets.progress()
+    if done >= total:
+        return
+    bar = pygame.Rect(WIDTH // 2 - 150, y, 300, 8)
+    draw_rect(screen, PICO_TEXT_COLOR, bar, 1, border_radius=4)
+    draw_rect(screen, PICO_TEXT_COLOR, (bar.x, bar.y, bar.w * done // total, bar.h), border_radius=4)
+
+
+def main(headless=HEADLESS):
+    """게임 실행 (headless면 창 없이 SDL dummy 비디오 드라이버로 그리고, 믹서 대신 NullSoundManager 사용)"""
+    # 믹서는 에셋 로더가 작업 스레드에서 초기화하므로 pygame.init() 대신 화면과 폰트만 초기화
+    init_display(headless)
+    pygame.font.init()
+    screen = create_display((WIDTH, HEIGHT))
     pygame.display.set_caption(TITLE)
 
-    # 폰트 초기화
+    # 한글 폰트 파일과 사운드는 타이틀 화면을 그리는 동안 작업 스레드에서 읽음
+    assets = AssetLoader()
+    assets.submit("korean_font", read_korean_font)
+    sound_manager = init_sound_manager(assets, headless)
+
+    # 폰트 초기화 (타이틀 화면에 필요한 영어 폰트만 바로 로드)
     font = get_english_font(36)
-    korean_font = get_korean_font(36)
+    korean_font = None  # 메뉴 화면부터 사용 (처음 필요할 때 로드가 끝날 때까지 기다림)
     big_font = get_english_font(64)
     title_font = get_english_font(100)
     clock = pygame.time.Clock()
 
     buttons = initialize_buttons()
+    static_layer = StaticLayer((WIDTH, HEIGHT), BACKGROUND_COLOR)
+    # 게임 화면에서 바뀐 영역만 다시 그리고 화면에 반영 (config.DIRTY_RECT_RENDERING)
+    dirty_renderer = DirtyRectRenderer(static_layer) if DIRTY_RECT_RENDERING else None
     stage_buttons = create_stage_buttons(MAX_STAGE)
     sound_slider, sfx_slider = initialize_sliders()
     
-    # Sound manager 초기화
-    sound_manager = init_sound_manager()
+    # Sound manager 볼륨 설정
     sound_manager.set_bgm_volume(sound_slider.value)
     sound_manager.set_sfx_volume(sfx_slider.value)
 
@@ -216,59 +347,45 @@ def main():
         (255, 100, 150), (100, 255, 200), (200, 200, 200)  # 분홍색, 청록색, 회색
     ]
     
-    # 효과음 재생을 위한 이전 상태 추적
-    previous_key_collected = False
-    previous_door_open = False
-    
     # 게임 오브젝트 초기화 (player_colors 정의 후)
-    stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-    if len(stage_result) == 7:
-        # 3스테이지: spike, floor_button 포함
-        players, key_obj, door_obj, platforms, moving_platforms, spike, floor_button = stage_result
-        bottom_spike = None
-        door_spike = None
-    elif len(stage_result) == 6:
-        # 4스테이지, 5스테이지, 또는 6스테이지
-        if current_stage == 4:
-            players, key_obj, door_obj, platforms, moving_platforms, bottom_spike = stage_result
-            spike = None
-            floor_button = None
-            door_spike = None
-            floor_spikes = None
-        elif current_stage == 5:
-            players, key_obj, door_obj, platforms, moving_platforms, door_spike = stage_result
-            spike = None
-            floor_button = None
-            bottom_spike = None
-            floor_spikes = None
-        else:  # 6스테이지
-            players, key_obj, door_obj, platforms, moving_platforms, floor_spikes = stage_result
-            spike = None
-            floor_button = None
-            bottom_spike = None
-            door_spike = None
-    elif len(stage_result) == 5:
-        players, key_obj, door_obj, platforms, moving_platforms = stage_result
-        spike = None
-        floor_button = None
-        bottom_spike = None
-        door_spike = None
-        floor_spikes = None
-    else:
-        players, key_obj, door_obj, platforms = stage_result
-        moving_platforms = []
-        spike = None
-        floor_button = None
-        bottom_spike = None
-        door_spike = None
-        floor_spikes = None
+    world = World(current_stage, player_colors, selected_player_count, tick_rate=SIM_TICK_RATE)
+    # 입력 리플레이 기록 (config.RECORD_REPLAYS가 True일 때 스테이지를 시작할 때마다 새로 기록)
+    # 리플레이는 60Hz 틱 기준이므로 SIM_TICK_RATE를 바꾸면 기록하지 않음
+    record_replays = RECORD_REPLAYS and SIM_TICK_RATE == TICK_RATE
+    recorder = None
+    # 고정 타임스텝으로 게임 로직을 진행하기 위해 남은 시간 누적
+    sim_accumulator = 0.0
+    # Pause 화면 배경: Pause에 들어갈 때 마지막 게임 화면에 오버레이를 한 번만 입혀서 저장
+    pause_frame = None
+
+    # 대기 화면에서 다시 그릴지 판단하기 위한 상태
+    all_buttons = list(buttons.values()) + stage_buttons
+    hover_state = None
+    redraw = True  # 상태가 바뀐 직후에는 기다리지 않고 한 번 더 그림
 
     running = True
     while running:
-        clock.tick(FPS)
-        for event in pygame.event.get():
+        if state in IDLE_STATES and not redraw:
+            # 정적인 화면: 입력이 올 때까지 잠들어 있음 (시간 초과면 그냥 한 번 다시 그림)
+            events = wait_for_events(IDLE_TIMEOUT_MS)
+            clock.tick()  # 기다린 시간은 다음 프레임 시간에 포함하지 않음
+            frame_seconds = 0.0
+            if (events and all(event.type == pygame.MOUSEMOTION for event in events)
+                    and not sound_slider.dragging and not sfx_slider.dragging
+                    and button_hover_state(all_buttons, mouse_pos()) == hover_state):
+                continue  # 마우스만 움직였고 hover 상태가 그대로면 다시 그리지 않음
+        else:
+            frame_seconds = clock.tick(FPS) / 1000.0
+            events = pygame.event.get()
+        frame_state = state
+        for event in events:
+            to_game_coords(event)  # 축소 해상도로 그릴 때 (config.RENDER_DIVISOR) 마우스 좌표를 게임 좌표로
             if event.type == pygame.QUIT:
                 running = False
+            if sound_manager.handle_event(event):
+                continue  # BGM이 끝나거나 다음 곡으로 넘어감
+            if event.type == pygame.WINDOWEXPOSED and dirty_renderer is not None:
+                dirty_renderer.invalidate()  # 창이 다시 보이면 화면 전체를 다시 그림
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -353,7 +470,7 @@ def main():
                 
                 # 마우스 클릭 처리
                 if event.type == pygame.MOUSEBUTTONUP:
-                    mx, my = pygame.mouse.get_pos()
+                    mx, my = mouse_pos()
                     
                     # 색상 선택 팝업 처리
                     if showing_color_picker is not None:
@@ -375,7 +492,11 @@ def main():
                                 btn_x = grid_start_x + (i % 3) * (btn_size + btn_spacing)
                                 btn_y = grid_start_y + (i // 3) * (btn_size + btn_spacing)
                                 if btn_x <= mx <= btn_x + btn_size and btn_y <= my <= btn_y + btn_size:
+                                    previous_color = player_colors[showing_color_picker]
                                     player_colors[showing_color_picker] = color
+                                    # 더 이상 쓰지 않는 색상의 캐릭터 스프라이트는 캐시에서 제거
+                                    if previous_color not in player_colors:
+                                        sprite_cache.discard_color(previous_color)
                                     showing_color_picker = None
                                     sound_manager.play_sfx('enter')
                                     break
@@ -414,52 +535,9 @@ def main():
                     # 모든 스테이지 클릭 가능
                     if button.handle_event(event):
                         current_stage = stage_num
-                        stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                        if len(stage_result) == 7:
-                            players, key_obj, door_obj, platforms, moving_platforms, spike, floor_button = stage_result
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        elif len(stage_result) == 6:
-                            # 4스테이지, 5스테이지, 또는 6스테이지
-                            if current_stage == 4:
-                                players, key_obj, door_obj, platforms, moving_platforms, bottom_spike = stage_result
-                                spike = None
-                                floor_button = None
-                                door_spike = None
-                                floor_spikes = None
-                            elif current_stage == 5:
-                                players, key_obj, door_obj, platforms, moving_platforms, door_spike = stage_result
-                                spike = None
-                                floor_button = None
-                                bottom_spike = None
-                                floor_spikes = None
-                            else:  # 6스테이지
-                                players, key_obj, door_obj, platforms, moving_platforms, floor_spikes = stage_result
-                                spike = None
-                                floor_button = None
-                                bottom_spike = None
-                                door_spike = None
-                        elif len(stage_result) == 5:
-                            players, key_obj, door_obj, platforms, moving_platforms = stage_result
-                            spike = None
-                            floor_button = None
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        else:
-                            players, key_obj, door_obj, platforms = stage_result
-                            moving_platforms = []
-                            spike = None
-                            floor_button = None
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        # 상호작용 상태 초기화
-                        active_players = players[:selected_player_count]
-                        door_obj.reset_interactions(active_players)
-                        previous_key_collected = False
-                        previous_door_open = False
+                        world = World(current_stage, player_colors, selected_player_count, tick_rate=SIM_TICK_RATE)
+                        save_replay(recorder)
+                        recorder = InputRecorder(current_stage, selected_player_count) if record_replays else None
                         state = STATE_GAME
                         break
 
@@ -482,53 +560,10 @@ def main():
                         )
                         state = STATE_GAME  # 게임 재개
                     if buttons["reset_stage"].handle_event(event):
-                        # 스테이지 리셋: 현재 스테이지 재초기화
-                        stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                        if len(stage_result) == 7:
-                            players, key_obj, door_obj, platforms, moving_platforms, spike, floor_button = stage_result
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        elif len(stage_result) == 6:
-                            # 4스테이지, 5스테이지, 또는 6스테이지
-                            if current_stage == 4:
-                                players, key_obj, door_obj, platforms, moving_platforms, bottom_spike = stage_result
-                                spike = None
-                                floor_button = None
-                                door_spike = None
-                                floor_spikes = None
-                            elif current_stage == 5:
-                                players, key_obj, door_obj, platforms, moving_platforms, door_spike = stage_result
-                                spike = None
-                                floor_button = None
-                                bottom_spike = None
-                                floor_spikes = None
-                            else:  # 6스테이지
-                                players, key_obj, door_obj, platforms, moving_platforms, floor_spikes = stage_result
-                                spike = None
-                                floor_button = None
-                                bottom_spike = None
-                                door_spike = None
-                        elif len(stage_result) == 5:
-                            players, key_obj, door_obj, platforms, moving_platforms = stage_result
-                            spike = None
-                            floor_button = None
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        else:
-                            players, key_obj, door_obj, platforms = stage_result
-                            moving_platforms = []
-                            spike = None
-                            floor_button = None
-                            bottom_spike = None
-                            door_spike = None
-                            floor_spikes = None
-                        # 상호작용 상태 초기화
-                        active_players = players[:selected_player_count]
-                        door_obj.reset_interactions(active_players)
-                        previous_key_collected = False
-                        previous_door_open = False
+                        # 스테이지 리셋: 현재 스테이지를 처음 상태로 복원
+                        world.restart()
+                        save_replay(recorder)
+                        recorder = InputRecorder(current_stage, selected_player_count) if record_replays else None
                         slider_orig_positions = restore_slider_positions(
                             sound_slider, sfx_slider, slider_orig_positions
                         )
@@ -550,24 +585,32 @@ def main():
             if state == STATE_MAIN:
                 # 처음 시작 시에만 BGM 재생
                 if previous_state == "":
-                    sound_manager.play_bgm(loop=-1)
+                    sound_manager.play_bgm(BGM_MENU, loop=-1)
             elif state == STATE_MENU:
                 # 메뉴로 전환 시 BGM 계속 재생 (재시작 안함)
                 pass
             elif state == STATE_GAME:
                 # 스테이지 진입 시에만 BGM 재시작
-                sound_manager.play_bgm(loop=-1)
+                sound_manager.play_bgm(BGM_GAME, loop=-1)
             elif state == STATE_PAUSE:
                 # pause 시 BGM 계속 재생 (일시정지 안함)
                 pass
             elif state == STATE_CLEAR:
-                sound_manager.play_bgm(loop=0)  # 폴더의 첫 번째 파일 자동 사용
+                sound_manager.play_bgm(BGM_CLEAR, loop=0)  # 그룹의 첫 번째 파일 한 번만 재생
             elif state == STATE_SETTINGS:
                 # 설정 창으로 전환 시 BGM 계속 재생 (재시작 안함)
                 pass
             previous_state = state
 
-        screen.fill(BACKGROUND_COLOR)
+        if korean_font is None and state != STATE_MAIN:
+            korean_font = get_korean_font(36, assets.get("korean_font"))
+
+        update_rects = None  # 화면에 반영할 영역 (None이면 화면 전체)
+        if state != STATE_PAUSE:
+            pause_frame = None
+        # 게임 화면은 고정 레이어가 화면 전체를 덮으므로 배경을 따로 칠하지 않음
+        if state != STATE_GAME and state != STATE_PAUSE:
+            screen.fill(BACKGROUND_COLOR)
 
         if state == STATE_MAIN:
             # 잔디밭 배경
@@ -584,7 +627,7 @@ def main():
             title_y = HEIGHT // 2 - 100
             draw_text_center(screen, title_text, title_font, PICO_TEXT_COLOR, WIDTH // 2, title_y)
             # 제목 밑줄 (같은 색상, 두껍고 둥근 모서리)
-            title_surface = title_font.render(title_text, True, PICO_TEXT_COLOR)
+            title_surface = render_text(title_font, title_text, PICO_TEXT_COLOR)
             title_width = title_surface.get_width()
             underline_y = title_y + title_surface.get_height() + 5
             underline_thickness = 8
@@ -592,9 +635,10 @@ def main():
             # 둥근 모서리를 가진 밑줄 그리기
             underline_rect = pygame.Rect(underline_x, underline_y - underline_thickness // 2, 
                                         title_width, underline_thickness)
-            pygame.draw.rect(screen, PICO_TEXT_COLOR, underline_rect, border_radius=underline_thickness // 2)
+            draw_rect(screen, PICO_TEXT_COLOR, underline_rect, border_radius=underline_thickness // 2)
             # 피코파크 스타일: Press Any Buttons 메시지
             draw_text_center(screen, "PRESS ANY BUTTONS", font, PICO_TEXT_COLOR, WIDTH // 2, HEIGHT // 2 + 100)
+            draw_loading_progress(screen, assets, HEIGHT // 2 + 140)
 
         elif state == STATE_MENU:
             # 잔디밭 배경
@@ -604,7 +648,7 @@ def main():
             title_y = 80
             draw_text_center(screen, title_text, title_font, PICO_TEXT_COLOR, WIDTH // 2, title_y)
             # 제목 밑줄 (같은 색상, 두껍고 둥근 모서리)
-            title_surface = title_font.render(title_text, True, PICO_TEXT_COLOR)
+            title_surface = render_text(title_font, title_text, PICO_TEXT_COLOR)
             title_width = title_surface.get_width()
             underline_y = title_y + title_surface.get_height() + 5
             underline_thickness = 8
@@ -612,7 +656,7 @@ def main():
             # 둥근 모서리를 가진 밑줄 그리기
             underline_rect = pygame.Rect(underline_x, underline_y - underline_thickness // 2, 
                                         title_width, underline_thickness)
-            pygame.draw.rect(screen, PICO_TEXT_COLOR, underline_rect, border_radius=underline_thickness // 2)
+            draw_rect(screen, PICO_TEXT_COLOR, underline_rect, border_radius=underline_thickness // 2)
             # 메뉴 화면 디자인 - 배경 직사각형 제거
             # Game Start, Settings, Exit 버튼 (중앙 정렬, 세로 배치, 그림자 효과)
             buttons["game_start"].draw(screen, font, korean_font, shadow=True)
@@ -637,7 +681,7 @@ def main():
             draw_text_center(screen, "Select Number of Player", big_font, PICO_TEXT_COLOR, WIDTH // 2, 80)
             # 숫자와 화살표 버튼 수평 정렬 (중앙 기준)
             number_y = 200
-            number_surface = big_font.render(str(selected_player_count), True, PICO_TEXT_COLOR)
+            number_surface = render_text(big_font, str(selected_player_count), PICO_TEXT_COLOR)
             number_height = number_surface.get_height()
             # 숫자와 버튼의 중앙을 맞춤
             button_center_y = number_y + number_height // 2
@@ -670,18 +714,18 @@ def main():
                 
                 # 박스 배경
                 box_rect = pygame.Rect(box_x, box_y, box_width, box_height)
-                pygame.draw.rect(screen, (240, 240, 240), box_rect)
-                pygame.draw.rect(screen, (200, 200, 200), box_rect, 3)
+                draw_rect(screen, (240, 240, 240), box_rect)
+                draw_rect(screen, (200, 200, 200), box_rect, 3)
                 
                 # 플레이어 이름 (맨 위)
                 name_y = box_y + 20
                 if editing_player_name == i:
                     # 편집 중일 때
                     name_text = player_names[i] + "_"
-                    name_surface = font.render(name_text, True, PICO_TEXT_COLOR)
+                    name_surface = render_text(font, name_text, PICO_TEXT_COLOR)
                 else:
                     name_text = player_names[i]
-                    name_surface = font.render(name_text, True, PICO_TEXT_COLOR)
+                    name_surface = render_text(font, name_text, PICO_TEXT_COLOR)
                 
                 screen.blit(name_surface, (box_x + (box_width - name_surface.get_width()) // 2, name_y))
                 
@@ -695,9 +739,9 @@ def main():
                 color_btn_y = char_y + int(char_size * 1.4) + 20
                 color_btn_width = box_width - 40  # 더 넓게
                 color_btn_rect = pygame.Rect(box_x + 20, color_btn_y, color_btn_width, 40)
-                pygame.draw.rect(screen, player_colors[i], color_btn_rect)
-                pygame.draw.rect(screen, (0, 0, 0), color_btn_rect, 2)
-                color_text = font.render("Change Color", True, (255, 255, 255))
+                draw_rect(screen, player_colors[i], color_btn_rect)
+                draw_rect(screen, (0, 0, 0), color_btn_rect, 2)
+                color_text = render_text(font, "Change Color", (255, 255, 255))
                 screen.blit(color_text, (box_x + (box_width - color_text.get_width()) // 2, color_btn_y + 10))
             
             # 색상 선택 팝업
@@ -708,10 +752,10 @@ def main():
                 # 팝업을 바닥 위에 여백을 두고 배치
                 picker_y = floor_y - 350 - 40  # 바닥에서 40픽셀 위로
                 picker_rect = pygame.Rect(picker_x, picker_y, 400, 350)  # 높이 증가
-                pygame.draw.rect(screen, (250, 250, 250), picker_rect)
-                pygame.draw.rect(screen, (0, 0, 0), picker_rect, 3)
+                draw_rect(screen, (250, 250, 250), picker_rect)
+                draw_rect(screen, (0, 0, 0), picker_rect, 3)
                 
-                picker_title = font.render("Select Color", True, (0, 0, 0))
+                picker_title = render_text(font, "Select Color", (0, 0, 0))
                 screen.blit(picker_title, (picker_x + (400 - picker_title.get_width()) // 2, picker_y + 20))
                 
                 # 색상 버튼들을 팝업 내부에 중심 정렬하여 배치
@@ -728,8 +772,8 @@ def main():
                     btn_y = grid_start_y + (i // 3) * (btn_size + btn_spacing)
                     color_btn = pygame.Rect(btn_x, btn_y, btn_size, btn_size)
                     # 팝업에서는 정사각형으로 표시
-                    pygame.draw.rect(screen, color, color_btn)
-                    pygame.draw.rect(screen, (0, 0, 0), color_btn, 2)
+                    draw_rect(screen, color, color_btn)
+                    draw_rect(screen, (0, 0, 0), color_btn, 2)
             
             # Select Stage 버튼 (오른쪽 아래, 바닥 위에 간격을 두고)
             floor_height = 120
@@ -754,299 +798,40 @@ def main():
                 button.draw(screen, font)
 
         elif state == STATE_GAME or state == STATE_PAUSE:
-            # 선택한 플레이어 수만큼만 계산 (한 번만)
-            active_players = players[:selected_player_count]
-            
-            # 게임 화면 그리기 (Pause일 때도 표시)
-            for platform in platforms:
-                pygame.draw.rect(screen, (120, 120, 120), platform)
-
-            # 게임 로직 업데이트 (Pause일 때는 업데이트 안 함)
+            # 게임 로직 업데이트 (Pause일 때는 업데이트 안 함) - 프레임 시간과 무관한 고정 타임스텝
             if state == STATE_GAME:
                 keys = pygame.key.get_pressed()
-                
-                # 4스테이지, 6스테이지: 동기화된 플레이어 처리
-                if (current_stage == 4 or current_stage == 6) and len(active_players) > 0:
-                    from entities import SyncedPlayer
-                    if isinstance(active_players[0], SyncedPlayer):
-                        # 모든 플레이어의 키 입력을 수집
-                        all_players_keys = []
-                        for i in range(selected_player_count):
-                            player_keys = {}
-                            # 각 플레이어의 키 매핑
-                            if i == 0:  # 플레이어 1: 방향키
-                                player_keys = {pygame.K_LEFT: keys[pygame.K_LEFT], pygame.K_RIGHT: keys[pygame.K_RIGHT], 
-                                             pygame.K_UP: keys[pygame.K_UP], pygame.K_DOWN: keys[pygame.K_DOWN]}
-                            elif i == 1:  # 플레이어 2: WASD
-                                player_keys = {pygame.K_a: keys[pygame.K_a], pygame.K_d: keys[pygame.K_d], 
-                                             pygame.K_w: keys[pygame.K_w], pygame.K_s: keys[pygame.K_s]}
-                            elif i == 2:  # 플레이어 3: IJKL
-                                player_keys = {pygame.K_j: keys[pygame.K_j], pygame.K_l: keys[pygame.K_l], 
-                                             pygame.K_i: keys[pygame.K_i], pygame.K_k: keys[pygame.K_k]}
-                            all_players_keys.append(player_keys)
-                        
-                        # 움직이는 발판 업데이트 (플레이어 업데이트 전에)
-                        for platform in moving_platforms:
-                            platform.update()
-                        
-                        # 플레이어가 움직이는 발판 위에 있는지 미리 확인하고 함께 이동
-                        player = active_players[0]
-                        player_rect = player.rect()
-                        was_on_moving_platform = False
-                        for platform in moving_platforms:
-                            platform_rect = platform.rect()
-                            # 플레이어가 발판 위에 있는지 확인 (발판의 위쪽 가장자리에 플레이어가 서 있는 경우)
-                            if (player_rect.colliderect(platform_rect) and 
-                                abs(player_rect.bottom - platform_rect.top) < 5 and 
-                                player.on_ground):
-                                # 발판이 이동한 만큼 플레이어도 함께 이동
-                                movement_delta = platform.get_movement_delta()
-                                player.y += movement_delta
-                                was_on_moving_platform = True
-                        
-                        # 움직이는 발판을 플랫폼으로 추가
-                        all_platforms = platforms + [p.rect() for p in moving_platforms]
-                        active_players[0].update(keys, platforms, all_platforms, all_players_keys)
-                        
-                        # 플레이어가 점프 직후에도 발판 위에 있다면 발판과 함께 이동 (가장자리에서 점프할 때)
-                        player = active_players[0]
-                        player_rect = player.rect()
-                        for platform in moving_platforms:
-                            platform_rect = platform.rect()
-                            # 플레이어가 발판 위에 있고, 플레이어의 X 위치가 발판 범위 내에 있는 경우
-                            if (player_rect.colliderect(platform_rect) and 
-                                player_rect.left < platform_rect.right and 
-                                player_rect.right > platform_rect.left):
-                                # 발판이 이동한 만큼 플레이어도 함께 이동 (점프 중에도)
-                                movement_delta = platform.get_movement_delta()
-                                if abs(movement_delta) > 0.1:  # 발판이 실제로 움직였을 때만
-                                    player.y += movement_delta
-                                    # 플레이어가 발판 위에 서 있는 경우에만 on_ground 유지
-                                    if abs(player_rect.bottom - platform_rect.top) < 5:
-                                        player.on_ground = True
-                else:
-                    # 일반 플레이어 처리
-                    all_platforms = platforms.copy()
-                    
-                    # 움직이는 발판도 플랫폼으로 추가
-                    if current_stage == 4 or current_stage == 5:
-                        for platform in moving_platforms:
-                            all_platforms.append(platform.rect())
-                    
-                    # 움직이는 발판 업데이트 (플레이어 업데이트 전에)
-                    if current_stage == 4 or current_stage == 5:
-                        for platform in moving_platforms:
-                            platform.update()
-                        
-                        # 플레이어가 움직이는 발판 위에 있는지 미리 확인하고 함께 이동
-                        for player in active_players:
-                            player_rect = player.rect()
-                            for platform in moving_platforms:
-                                platform_rect = platform.rect()
-                                # 플레이어가 발판 위에 있는지 확인 (발판의 위쪽 가장자리에 플레이어가 서 있는 경우)
-                                if (player_rect.colliderect(platform_rect) and 
-                                    abs(player_rect.bottom - platform_rect.top) < 5 and 
-                                    player.on_ground):
-                                    # 발판이 이동한 만큼 플레이어도 함께 이동
-                                    movement_delta = platform.get_movement_delta()
-                                    player.y += movement_delta
-                    
-                    # 플레이어 간 충돌 처리를 위해 다른 플레이어 리스트 전달
-                    for i, player in enumerate(active_players):
-                        other_players = [p for j, p in enumerate(active_players) if j != i]
-                        player.update(keys, all_platforms, other_players)
-                    
-                    # 플레이어가 점프 직후에도 발판 위에 있다면 발판과 함께 이동 (가장자리에서 점프할 때)
-                    if current_stage == 4 or current_stage == 5:
-                        for player in active_players:
-                            player_rect = player.rect()
-                            for platform in moving_platforms:
-                                platform_rect = platform.rect()
-                                # 플레이어가 발판 위에 있고, 플레이어의 X 위치가 발판 범위 내에 있는 경우
-                                if (player_rect.colliderect(platform_rect) and 
-                                    player_rect.left < platform_rect.right and 
-                                    player_rect.right > platform_rect.left):
-                                    # 발판이 이동한 만큼 플레이어도 함께 이동 (점프 중에도)
-                                    movement_delta = platform.get_movement_delta()
-                                    if abs(movement_delta) > 0.1:  # 발판이 실제로 움직였을 때만
-                                        player.y += movement_delta
-                                        # 플레이어가 발판 위에 서 있는 경우에만 on_ground 유지
-                                        if abs(player_rect.bottom - platform_rect.top) < 5:
-                                            player.on_ground = True
-                
-                key_obj.update(active_players)
-                # 열쇠 획득 효과음
-                if key_obj.collected and not previous_key_collected:
-                    sound_manager.play_sfx('itempickup')
-                previous_key_collected = key_obj.collected
-                
-                door_obj.update(active_players)
-                # 문 열림 효과음
-                if door_obj.open and not previous_door_open:
-                    sound_manager.play_sfx('enter')
-                previous_door_open = door_obj.open
-                
-                # 3스테이지: 가시 충돌 체크 및 버튼 처리
-                if current_stage == 3 and spike is not None:
-                    # 가시 충돌 체크 (게임 오버)
-                    if spike.check_collision(active_players):
-                        # 게임 오버: 스테이지 리셋
-                        stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                        players, key_obj, door_obj, platforms, moving_platforms, spike, floor_button = stage_result
-                        active_players = players[:selected_player_count]
-                        door_obj.reset_interactions(active_players)
-                        door_spike = None
-                        floor_spikes = None
-                    
-                    # 버튼 업데이트
-                    if floor_button is not None:
-                        floor_button.update(active_players)
-                        # 버튼이 눌려있으면 바닥 생성 (뚫려있는 곳 매꾸기)
-                        if floor_button.pressed:
-                            gap_platform = pygame.Rect(400, 580, 160, 60)  # 400~560 사이
-                            # 이미 추가되어 있지 않은 경우에만 추가
-                            gap_exists = False
-                            for p in platforms:
-                                if p.x == 400 and p.y == 580 and p.w == 160 and p.h == 60:
-                                    gap_exists = True
-                                    break
-                            if not gap_exists:
-                                platforms.append(gap_platform)
-                        else:
-                            # 버튼이 눌리지 않았으면 gap_platform 제거
-                            platforms = [p for p in platforms if not (p.x == 400 and p.y == 580 and p.w == 160 and p.h == 60)]
-                
-                # 4스테이지: 하단 가시 충돌 체크
-                if current_stage == 4 and bottom_spike is not None:
-                    # 가시 충돌 체크 (게임 오버)
-                    if bottom_spike.check_collision(active_players):
-                        # 게임 오버: 스테이지 리셋
-                        stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                        players, key_obj, door_obj, platforms, moving_platforms, bottom_spike = stage_result
-                        active_players = players[:selected_player_count]
-                        door_obj.reset_interactions(active_players)
-                        door_spike = None
-                        floor_spikes = None
-                
-                # 5스테이지: 문 왼쪽 가시 충돌 체크
-                if current_stage == 5 and door_spike is not None:
-                    # 가시 충돌 체크 (게임 오버)
-                    if door_spike.check_collision(active_players):
-                        # 게임 오버: 스테이지 리셋
-                        stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                        if len(stage_result) == 6:
-                            players, key_obj, door_obj, platforms, moving_platforms, door_spike = stage_result
-                        active_players = players[:selected_player_count]
-                        door_obj.reset_interactions(active_players)
-                
-                # 6스테이지: 바닥 가시 충돌 체크
-                if current_stage == 6 and floor_spikes is not None:
-                    # 모든 가시에 대해 충돌 체크
-                    for spike in floor_spikes:
-                        if spike.check_collision(active_players):
-                            # 게임 오버: 스테이지 리셋
-                            stage_result = create_stage_objects(current_stage, player_colors, selected_player_count)
-                            if len(stage_result) == 6:
-                                players, key_obj, door_obj, platforms, moving_platforms, floor_spikes = stage_result
-                                spike = None
-                                floor_button = None
-                                bottom_spike = None
-                                door_spike = None
-                            active_players = players[:selected_player_count]
-                            door_obj.reset_interactions(active_players)
-                            break
-                
-                # 문과의 상호작용 체크 (지속적으로)
-                door_obj.check_interaction(active_players, keys)
-                
-                # 열쇠가 수집되었는지 확인
-                any_has_key = any(p.has_key for p in active_players)
-                if key_obj.collected and not any_has_key:
-                    key_obj.attached_to_player = False
-                
-                # 모든 플레이어가 문과 상호작용했는지 확인
-                if door_obj.all_players_interacted(active_players):
-                    state = STATE_CLEAR
-                    # 다음 스테이지 준비를 위해 상호작용 상태 초기화
-                    door_obj.reset_interactions(active_players)
-                elif door_obj.open:
-                    # 문이 열려있고 일부 플레이어만 상호작용한 경우 힌트 표시
-                    door_rect = door_obj.rect()
-                    players_at_door = [p for p in active_players if door_rect.colliderect(p.rect())]
-                    if players_at_door:
-                        interacted_count = sum(1 for p in active_players if p.interacted_with_door)
-                        total_count = len(active_players)
-                        hint_text = f"Press \"Down keys\" to enter ({interacted_count}/{total_count})"
-                        hint = font.render(hint_text, True, PICO_TEXT_COLOR)
-                        screen.blit(hint, (door_obj.x - 320, door_obj.y - 60))
-            # 5스테이지: 움직이는 발판 렌더링
-            if current_stage == 5:
-                for platform in moving_platforms:
-                    platform.draw(screen)
-            # 움직이는 발판 렌더링
-            if current_stage == 4:
-                for platform in moving_platforms:
-                    platform.draw(screen)
-            
-            # 3스테이지: 가시와 버튼 렌더링
-            if current_stage == 3:
-                if spike is not None and (floor_button is None or not floor_button.pressed):
-                    spike.draw(screen)
-                if floor_button is not None:
-                    floor_button.draw(screen, font)
-            
-            # 4스테이지: 하단 가시 렌더링
-            if current_stage == 4 and bottom_spike is not None:
-                bottom_spike.draw(screen)
-            
-            # 5스테이지: 문 왼쪽 가시 렌더링
-            if current_stage == 5 and door_spike is not None:
-                door_spike.draw(screen)
-            
-            # 6스테이지: 바닥 가시 렌더링
-            if current_stage == 6 and floor_spikes is not None:
-                for spike in floor_spikes:
-                    spike.draw(screen)
-            
-            # 플레이어 렌더링 (문 안으로 들어간 플레이어는 먼저 그리기)
-            for player in active_players:
-                if player.entered_door:
-                    player.draw(screen)
-            for player in active_players:
-                if not player.entered_door:
-                    player.draw(screen)
-            key_obj.draw(screen)
-            door_obj.draw(screen, font)
-            
-            # 1스테이지: 조작키 설명 표시
-            if current_stage == 1:
-                controls_text = [
-                    "Player 1: Arrow Keys",
-                    "Player 2: WASD (W/A/S/D)",
-                    "Player 3: IJKL (I/J/K/L)"
-                ]
-                y_offset = 50
-                for i, text in enumerate(controls_text):
-                    if i < selected_player_count:
-                        control_label = font.render(text, True, PICO_TEXT_COLOR)
-                        screen.blit(control_label, (10, y_offset + i * 30))
-            
-            # 4스테이지, 6스테이지: 동기화 메시지 표시
-            if current_stage == 4 or current_stage == 6:
-                sync_message = "All players must input the same action to move!"
-                sync_label = font.render(sync_message, True, PICO_TEXT_COLOR)
-                # 화면 상단 중앙에 표시
-                message_x = (WIDTH - sync_label.get_width()) // 2
-                screen.blit(sync_label, (message_x, 50))
-
-            stage_label = font.render(f"Stage {current_stage}", True, PICO_TEXT_COLOR)
-            screen.blit(stage_label, (WIDTH - stage_label.get_width() - 12, 12))
-            
+                sim_accumulator = min(sim_accumulator + frame_seconds, MAX_TICKS_PER_FRAME * world.tick_seconds)
+                while sim_accumulator >= world.tick_seconds:
+                    sim_accumulator -= world.tick_seconds
+                    if recorder is not None:
+                        recorder.record(keys)
+                    for game_event in world.step(keys):
+                        if game_event == EVENT_KEY_COLLECTED:
+                            sound_manager.play_sfx('itempickup')  # 열쇠 획득 효과음
+                        elif game_event == EVENT_DOOR_OPENED:
+                            sound_manager.play_sfx('enter')  # 문 열림 효과음
+                    if world.cleared:
+                        state = STATE_CLEAR
+                        save_replay(recorder)
+                        recorder = None
+                        break
+
+            # 게임 화면 그리기 (Pause일 때는 멈춘 화면을 한 번만 그려서 재사용)
+            if state == STATE_GAME and dirty_renderer is not None:
+                update_rects = draw_game_scene(screen, world, font, show_hint=True, dirty_renderer=dirty_renderer)
+            elif state == STATE_GAME or pause_frame is None:
+                draw_game_scene(screen, world, font, show_hint=(state == STATE_GAME), static_layer=static_layer)
+
             # Pause 창이면 오버레이 표시
             if state == STATE_PAUSE:
-                # 반투명 배경 오버레이
-                overlay = create_overlay(WIDTH, HEIGHT, 180)
-                screen.blit(overlay, (0, 0))
+                if pause_frame is None:
+                    # 반투명 배경 오버레이를 입힌 게임 화면 저장
+                    overlay = create_overlay(WIDTH, HEIGHT, 180)
+                    screen.blit(overlay, (0, 0))
+                    pause_frame = screen.copy()
+                else:
+                    screen.blit(pause_frame, (0, 0))
                 
                 # Pause 창 크기와 위치 (화면 중앙, 상대적 위치) - 더 넓게, 위아래 틈 추가
                 panel_width = 760
@@ -1056,8 +841,8 @@ def main():
                 panel_y = margin + (HEIGHT - panel_height - 2 * margin) // 2
                 
                 pause_panel = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
-                pygame.draw.rect(screen, (240, 240, 240), pause_panel)
-                pygame.draw.rect(screen, (0, 0, 0), pause_panel, 4)
+                draw_rect(screen, (240, 240, 240), pause_panel)
+                draw_rect(screen, (0, 0, 0), pause_panel, 4)
                 
                 # PAUSE 제목 (상대적 위치)
                 title_y = panel_y + 40
@@ -1084,7 +869,7 @@ def main():
                 ]
                 
                 for label_text, slider, label_y in slider_configs:
-                    label = font.render(label_text, True, PICO_TEXT_COLOR)
+                    label = render_text(font, label_text, PICO_TEXT_COLOR)
                     screen.blit(label, (label_start_x, label_y))
                     
                     slider_y = label_y + 5
@@ -1095,7 +880,7 @@ def main():
                     slider.draw(screen)
                 
                     val = int(slider.value * 10)
-                    num = font.render(str(val), True, PICO_TEXT_COLOR)
+                    num = render_text(font, str(val), PICO_TEXT_COLOR)
                     num_height = num.get_height()
                     screen.blit(num, (num_x, slider_y + 4 - num_height // 2))
                 
@@ -1126,8 +911,8 @@ def main():
                     
                     # 확인 팝업 창
                     popup_rect = pygame.Rect(280, 250, 400, 200)
-                    pygame.draw.rect(screen, (250, 250, 250), popup_rect)
-                    pygame.draw.rect(screen, (0, 0, 0), popup_rect, 3)
+                    draw_rect(screen, (250, 250, 250), popup_rect)
+                    draw_rect(screen, (0, 0, 0), popup_rect, 3)
                     
                     draw_text_center(screen, "정말 종료하시겠습니까?", font, PICO_TEXT_COLOR, WIDTH // 2, 290, korean_font)
                     buttons["exit_yes"].draw(screen, font)
@@ -1147,8 +932,8 @@ def main():
             
             # Settings 창 (메뉴에서 들어온 설정)
             draw_text_center(screen, "SETTINGS", big_font, PICO_TEXT_COLOR, WIDTH // 2, 80)
-            sound_label = font.render("Background Sound Volume", True, PICO_TEXT_COLOR)
-            sfx_label = font.render("Effect Sound Volume", True, PICO_TEXT_COLOR)
+            sound_label = render_text(font, "Background Sound Volume", PICO_TEXT_COLOR)
+            sfx_label = render_text(font, "Effect Sound Volume", PICO_TEXT_COLOR)
             screen.blit(sound_label, (220, 206))
             screen.blit(sfx_label, (220, 306))
 
@@ -1156,19 +941,32 @@ def main():
             sfx_slider.draw(screen)
             sound_val = int(sound_slider.value * 10)
             sfx_val = int(sfx_slider.value * 10)
-            sound_num = font.render(str(sound_val), True, PICO_TEXT_COLOR)
-            sfx_num = font.render(str(sfx_val), True, PICO_TEXT_COLOR)
+            sound_num = render_text(font, str(sound_val), PICO_TEXT_COLOR)
+            sfx_num = render_text(font, str(sfx_val), PICO_TEXT_COLOR)
             screen.blit(sound_num, (700, 226))
             screen.blit(sfx_num, (700, 326))
 
             buttons["go_back"].draw(screen, font, korean_font)
 
-        pygame.display.update()
-
+        if update_rects is not None:
+            pygame.display.update(update_rects)
+        else:
+            pygame.display.update()
+            if dirty_renderer is not None:
+                # 다른 화면이나 오버레이를 그렸으므로 다음 게임 프레임은 화면 전체를 다시 그림
+                dirty_renderer.invalidate()
+        hover_state = button_hover_state(all_buttons, mouse_pos())
+        redraw = state != frame_state
+
+    save_replay(recorder)
+    assets.shutdown()
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Dumb N Dumbers")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="창과 오디오 장치 없이 실행 (서버, CI용)")
+    main(parser.parse_args().headless)
 
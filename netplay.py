@@ -0,0 +1,411 @@
+import argparse
+import heapq
+import random
+import socket
+import struct
+import sys
+import time
+
+from config import MAX_STAGE
+from simulation import World, KeyState, TICK_SECONDS, inputs_from_keys
+
+
+# 패킷: 보낸 피어 번호, 플레이어 번호, 확인(ack) 프레임, 첫 입력 프레임, 입력 개수 + 입력 비트마스크(1바이트씩)
+PACKET_FORMAT = "<BBIIB"
+PACKET_HEADER_SIZE = struct.calcsize(PACKET_FORMAT)
+MAX_INPUTS_PER_PACKET = 64  # 아직 확인받지 못한 입력을 최대 몇 개까지 다시 보낼지
+
+INPUT_DELAY = 2  # 로컬 입력을 몇 프레임 뒤에 적용할지 (롤백 횟수를 줄임)
+MAX_ROLLBACK = 8  # 확인된 원격 입력보다 최대 몇 프레임 앞서 예측 진행할지 (넘으면 대기)
+
+
+class UdpTransport:
+    """논블로킹 UDP 소켓 - 모든 피어에게 같은 데이터그램을 보냄"""
+    def __init__(self, port=0, host="127.0.0.1", peers=()):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.peers = list(peers)
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def send(self, data):
+        for peer in self.peers:
+            try:
+                self.sock.sendto(data, peer)
+            except OSError:
+                pass  # 상대가 아직 없거나 버퍼가 가득 참 - 다음 패킷에서 다시 보냄
+
+    def receive(self):
+        """받은 데이터그램 전부 반환 (없으면 빈 리스트)"""
+        packets = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            packets.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class LatencyShim:
+    """보내는 패킷에 인위적인 지연/지터/손실을 넣는 전송 래퍼 (실제 네트워크 없이 테스트용)
+
+    latency, jitter는 초 단위. clock을 바꾸면 가상 시간으로 빠르게 테스트할 수 있다.
+    """
+    def __init__(self, transport, latency=0.0, jitter=0.0, loss=0.0, seed=None, clock=time.monotonic):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.queue = []  # (보낼 시간, 순번, 데이터) 힙
+        self.sequence = 0
+
+    @property
+    def address(self):
+        return self.transport.address
+
+    def send(self, data):
+        if self.loss and self.random.random() < self.loss:
+            return
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        heapq.heappush(self.queue, (self.clock() + delay, self.sequence, data))
+        self.sequence += 1
+        self.flush()
+
+    def flush(self):
+        """보낼 시간이 된 패킷 전송"""
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            self.transport.send(heapq.heappop(self.queue)[2])
+
+    def receive(self):
+        self.flush()
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+
+class RollbackSession:
+    """GGPO 방식 롤백 세션 - 원격 입력을 예측해서 바로 진행하고, 예측이 틀리면 되돌려서 다시 계산
+
+    각 피어는 자기 플레이어(local_players)의 입력만 보내고, 원격 플레이어 입력은 마지막으로 받은
+    입력이 계속된다고 예측한다. 늦게 도착한 입력이 예측과 다르면 그 프레임의 World 스냅샷으로
+    되돌린 뒤 현재 프레임까지 다시 시뮬레이션한다.
+    """
+    def __init__(self, world, local_players, transport, peer_id=None, input_delay=INPUT_DELAY,
+                 max_rollback=MAX_ROLLBACK):
+        self.world = world
+        self.player_count = world.player_count
+        self.local_players = list(local_players)
+        self.remote_players = [p for p in range(self.player_count) if p not in self.local_players]
+        self.transport = transport
+        self.peer_id = self.local_players[0] if peer_id is None else peer_id
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+
+        self.frame = 0  # 다음에 시뮬레이션할 프레임
+        # 플레이어별 확인된 입력 {프레임: 비트마스크} (입력 지연만큼의 첫 프레임은 모두 입력 없음)
+        self.inputs = [{frame: 0 for frame in range(input_delay)} for _ in range(self.player_count)]
+        self.confirmed = [input_delay] * self.player_count  # 플레이어별로 입력이 빠짐없이 확인된 다음 프레임
+        self.used_inputs = {}  # 프레임 -> 시뮬레이션에 사용한 (예측 포함) 입력
+        self.snapshots = {}  # 프레임 -> 그 프레임을 시뮬레이션하기 전 World 스냅샷
+        self.rollback_frame = None
+        self.peer_acks = {}  # 피어 번호 -> 그 피어가 다음으로 기다리는 우리 입력 프레임
+
+        self.rollbacks = 0
+        self.resimulated_frames = 0
+        self.max_rollback_depth = 0
+        self.stalls = 0
+
+    @property
+    def confirmed_frame(self):
+        """모든 플레이어의 입력이 확인된 다음 프레임 (이전 프레임은 더 이상 롤백되지 않음)"""
+        return min(self.confirmed)
+
+    @property
+    def synchronized(self):
+        """지금까지 시뮬레이션한 모든 프레임이 확인된 입력으로 계산되었는지"""
+        return self.rollback_frame is None and self.confirmed_frame >= self.frame
+
+    def advance(self, local_inputs):
+        """로컬 플레이어 입력(비트마스크 리스트)을 넣고 한 프레임 진행
+
+        World 이벤트 리스트 반환. 원격 입력을 너무 오래 못 받아서 진행할 수 없으면 None 반환.
+        """
+        self.poll()
+        remote_confirmed = min((self.confirmed[p] for p in self.remote_players), default=self.frame)
+        if self.frame - remote_confirmed >= self.max_rollback:
+            self.stalls += 1
+            self.send()
+            return None
+
+        target = self.frame + self.input_delay
+        for player, mask in zip(self.local_players, local_inputs):
+            self._store_input(player, target, mask)
+        self.send()
+
+        events = self._simulate(self.frame)
+        self.frame += 1
+        self._trim()
+        return events
+
+    def poll(self):
+        """받은 패킷을 처리하고, 예측이 틀린 프레임이 있으면 롤백"""
+        for data in self.transport.receive():
+            self._handle_packet(data)
+        if self.rollback_frame is not None:
+            self._rollback(self.rollback_frame)
+
+    def send(self):
+        """아직 확인받지 못한 로컬 입력을 (중복 포함) 보냄 - 패킷이 손실돼도 다음 패킷으로 복구"""
+        ack = min((self.confirmed[p] for p in self.remote_players), default=self.frame)
+        start = min(self.peer_acks.values(), default=0)
+        for player in self.local_players:
+            end = self.confirmed[player]
+            first = max(start, end - MAX_INPUTS_PER_PACKET)
+            masks = bytes(self.inputs[player][frame] for frame in range(first, end))
+            header = struct.pack(PACKET_FORMAT, self.peer_id, player, ack, first, len(masks))
+            self.transport.send(header + masks)
+
+    def _handle_packet(self, data):
+        if len(data) < PACKET_HEADER_SIZE:
+            return
+        peer_id, player, ack, first, count = struct.unpack_from(PACKET_FORMAT, data)
+        if peer_id == self.peer_id or player not in self.remote_players:
+            return
+        self.peer_acks[peer_id] = max(ack, self.peer_acks.get(peer_id, 0))
+        masks = data[PACKET_HEADER_SIZE:PACKET_HEADER_SIZE + count]
+        for offset, mask in enumerate(masks):
+            self._store_input(player, first + offset, mask)
+
+    def _store_input(self, player, frame, mask):
+        inputs = self.inputs[player]
+        if frame < self.confirmed[player] or frame in inputs:
+            return
+        inputs[frame] = mask
+        while self.confirmed[player] in inputs:
+            self.confirmed[player] += 1
+        # 이미 예측으로 시뮬레이션한 프레임인데 예측이 틀렸으면 롤백 예약
+        used = self.used_inputs.get(frame)
+        if used is not None and used[player] != mask:
+            if self.rollback_frame is None or frame < self.rollback_frame:
+                self.rollback_frame = frame
+
+    def _predict(self, player, frame):
+        """frame의 입력 (확인된 입력이 없으면 마지막으로 확인된 입력이 계속된다고 예측)"""
+        inputs = self.inputs[player]
+        mask = inputs.get(frame)
+        if mask is None:
+            mask = inputs.get(self.confirmed[player] - 1, 0)
+        return mask
+
+    def _simulate(self, frame):
+        self.snapshots[frame] = self.world.snapshot()
+        masks = tuple(self._predict(player, frame) for player in range(self.player_count))
+        self.used_inputs[frame] = masks
+        return self.world.step(KeyState.from_inputs(masks))
+
+    def _rollback(self, frame):
+        """frame으로 되돌린 뒤 현재 프레임까지 다시 시뮬레이션 (이벤트는 다시 내보내지 않음)"""
+        self.rollback_frame = None
+        self.world.restore(self.snapshots[frame])
+        for resimulated in range(frame, self.frame):
+            self._simulate(resimulated)
+        depth = self.frame - frame
+        self.rollbacks += 1
+        self.resimulated_frames += depth
+        self.max_rollback_depth = max(self.max_rollback_depth, depth)
+
+    def _trim(self):
+        """더 이상 롤백될 수 없는 프레임의 스냅샷과 입력 정리"""
+        oldest = min(self.confirmed_frame, self.frame)
+        for frame in [f for f in self.snapshots if f < oldest]:
+            del self.snapshots[frame]
+            del self.used_inputs[frame]
+        acked = min(self.peer_acks.values(), default=0)
+        for player, inputs in enumerate(self.inputs):
+            # 롤백해서 다시 계산할 수 있는 프레임, 예측에 쓰는 마지막 확인 입력,
+            # 상대가 아직 확인하지 않은 로컬 입력은 남김
+            keep = min(oldest, self.confirmed[player] - 1)
+            if player in self.local_players:
+                keep = min(keep, acked)
+            for frame in [f for f in inputs if f < keep]:
+                del inputs[frame]
+
+
+def split_players(player_count, peer_count=2):
+    """플레이어를 피어에게 번갈아 배정 (2명 → [0], [1] / 3명 → [0, 2], [1])"""
+    return [list(range(peer, player_count, peer_count)) for peer in range(peer_count)]
+
+
+def random_script(seed, frames, player_count):
+    """루프백 테스트용 입력: 플레이어마다 임의의 입력을 5~30프레임씩 유지"""
+    rnd = random.Random(seed)
+    script = []
+    for _ in range(player_count):
+        masks = []
+        while len(masks) < frames:
+            masks.extend([rnd.randrange(16)] * rnd.randint(5, 30))
+        script.append(masks[:frames])
+    return script
+
+
+def run_loopback(stage=1, player_count=2, frames=1200, latency=0.08, jitter=0.02, loss=0.0, seed=0,
+                 input_delay=INPUT_DELAY, max_rollback=MAX_ROLLBACK):
+    """127.0.0.1 UDP로 연결한 두 세션을 가상 시간으로 돌리고 결과가 같은지 확인
+
+    두 세션의 최종 World 상태, 그리고 확인된 입력만으로 따로 돌린 World 상태가 모두 같아야 한다.
+    통계 dict 반환.
+    """
+    now = [0.0]
+
+    def clock():
+        return now[0]
+
+    script = random_script(seed, frames + input_delay, player_count)
+    transports = [UdpTransport() for _ in range(2)]
+    transports[0].peers = [transports[1].address]
+    transports[1].peers = [transports[0].address]
+    sessions = []
+    for peer, local_players in enumerate(split_players(player_count)):
+        shim = LatencyShim(transports[peer], latency, jitter, loss, seed=seed * 2 + peer, clock=clock)
+        sessions.append(RollbackSession(World(stage, None, player_count), local_players, shim, peer,
+                                        input_delay, max_rollback))
+    try:
+        # 60Hz로 진행 (소켓 전달을 기다리기 위해 실제로도 아주 잠깐씩 쉼)
+        while any(session.frame < frames for session in sessions):
+            for session in sessions:
+                if session.frame < frames:
+                    target = session.frame + input_delay
+                    session.advance([script[player][target] for player in session.local_players])
+            now[0] += TICK_SECONDS
+            time.sleep(0.0002)
+        # 남은 입력이 모두 도착해서 롤백이 끝날 때까지 대기
+        for _ in range(int(10 / TICK_SECONDS)):
+            if all(session.synchronized for session in sessions):
+                break
+            for session in sessions:
+                session.poll()
+                session.send()
+            now[0] += TICK_SECONDS
+            time.sleep(0.0002)
+    finally:
+        for transport in transports:
+            transport.close()
+
+    # 확인된 입력으로 롤백 없이 돌린 기준 결과
+    reference = World(stage, None, player_count)
+    for frame in range(frames):
+        masks = [0] * player_count if frame < input_delay else [script[p][frame] for p in range(player_count)]
+        reference.step(KeyState.from_inputs(masks))
+    expected = reference.snapshot()
+    return {
+        "frames": frames,
+        "synchronized": all(session.synchronized for session in sessions),
+        "match": all(session.world.snapshot() == expected for session in sessions),
+        "rollbacks": [session.rollbacks for session in sessions],
+        "resimulated_frames": [session.resimulated_frames for session in sessions],
+        "max_rollback_depth": [session.max_rollback_depth for session in sessions],
+        "stalls": [session.stalls for session in sessions],
+    }
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def run_online(args):
+    """창을 띄우고 한 피어로 온라인 협동 플레이 (각 피어는 방향키로 자기 플레이어를 조작)"""
+    import pygame
+    from config import WIDTH, HEIGHT, TITLE, BACKGROUND_COLOR, PICO_TEXT_COLOR
+    from main import draw_game_scene, get_english_font
+    from renderer import create_display
+    from ui import draw_text_center
+
+    pygame.display.init()  # 소리는 쓰지 않으므로 믹서는 초기화하지 않음
+    pygame.font.init()
+    screen = create_display((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"{TITLE} - Online (players {', '.join(str(p + 1) for p in args.local)})")
+    clock = pygame.time.Clock()
+    font = get_english_font(36)
+    small_font = get_english_font(24)
+
+    transport = UdpTransport(args.port, args.bind, [parse_address(peer) for peer in args.peer])
+    if args.latency or args.jitter or args.loss:
+        transport = LatencyShim(transport, args.latency / 1000.0, args.jitter / 1000.0, args.loss)
+    session = RollbackSession(World(args.stage, None, args.players), args.local, transport,
+                              input_delay=args.input_delay)
+
+    accumulator = 0.0
+    running = True
+    while running:
+        accumulator = min(accumulator + clock.tick(60) / 1000.0, 5 * TICK_SECONDS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        keys = pygame.key.get_pressed()
+        # 로컬 플레이어가 여러 명이면 방향키, WASD, IJKL 순서로 조작
+        local_inputs = inputs_from_keys(keys, len(session.local_players))
+        while accumulator >= TICK_SECONDS and not session.world.cleared:
+            accumulator -= TICK_SECONDS
+            session.advance(local_inputs)
+        if session.world.cleared:
+            session.poll()
+            session.send()
+
+        screen.fill(BACKGROUND_COLOR)
+        draw_game_scene(screen, session.world, font)
+        status = f"frame {session.frame}  rollbacks {session.rollbacks}  stalls {session.stalls}"
+        draw_text_center(screen, status, small_font, PICO_TEXT_COLOR, WIDTH // 2, HEIGHT - 20)
+        if session.world.cleared:
+            draw_text_center(screen, "STAGE CLEAR!", font, PICO_TEXT_COLOR, WIDTH // 2, HEIGHT // 2)
+        pygame.display.update()
+
+    transport.close()
+    pygame.quit()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="롤백 넷코드 온라인 협동 모드 / 루프백 테스트")
+    parser.add_argument("--stage", type=int, default=1, choices=range(1, MAX_STAGE + 1))
+    parser.add_argument("--players", type=int, default=2, choices=(2, 3), help="전체 플레이어 수")
+    parser.add_argument("--input-delay", type=int, default=INPUT_DELAY, help="로컬 입력 지연 프레임 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="인위적인 지연 (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="인위적인 지연 변동 (±ms)")
+    parser.add_argument("--loss", type=float, default=0.0, help="인위적인 패킷 손실 비율 (0~1)")
+    parser.add_argument("--loopback", action="store_true",
+                        help="창 없이 두 세션을 127.0.0.1로 연결해서 결과가 같은지 테스트")
+    parser.add_argument("--frames", type=int, default=1200, help="루프백 테스트 프레임 수")
+    parser.add_argument("--seed", type=int, default=0, help="루프백 테스트 입력 시드")
+    parser.add_argument("--port", type=int, default=7777, help="이 피어의 UDP 포트")
+    parser.add_argument("--bind", default="0.0.0.0", help="바인드할 주소")
+    parser.add_argument("--peer", action="append", default=[], help="상대 피어 주소 (host:port)")
+    parser.add_argument("--local", type=int, nargs="+", default=[0], help="이 피어가 조작할 플레이어 번호 (0부터)")
+    args = parser.parse_args(argv)
+
+    if args.loopback:
+        result = run_loopback(args.stage, args.players, args.frames, args.latency / 1000.0,
+                              args.jitter / 1000.0, args.loss, args.seed, args.input_delay)
+        print(f"stage {args.stage} x{args.players}: {result['frames']} frames, "
+              f"{'MATCH' if result['match'] else 'DESYNC'}"
+              f"{'' if result['synchronized'] else ' (not synchronized)'}")
+        print(f"rollbacks {result['rollbacks']}, resimulated {result['resimulated_frames']}, "
+              f"max depth {result['max_rollback_depth']}, stalls {result['stalls']}")
+        return 0 if result["match"] else 1
+    if not args.peer:
+        parser.error("--peer 또는 --loopback이 필요합니다")
+    return run_online(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import os
+
+import pygame
+
+from canvas import Canvas, draw_rect, new_surface, set_render_divisor, target_rect, target_surface
+from config import BACKGROUND_COLOR, RENDER_DIVISOR, RENDER_SCALE
+
+
+PLATFORM_COLOR = (120, 120, 120)
+
+
+def init_display(headless=False):
+    """pygame 화면 모듈 초기화 (headless면 SDL dummy 비디오 드라이버를 써서 창 없이 실행)"""
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.display.init()
+
+
+def create_display(size, scale=RENDER_SCALE, divisor=RENDER_DIVISOR):
+    """게임 화면을 만들어 반환 (pygame.display.set_mode 대신 사용)
+
+    divisor가 2 이상이면 게임은 size/divisor 해상도 Surface에 그리고 (그리는 비용 약 1/divisor²),
+    게임 좌표로 그릴 수 있도록 canvas.Canvas로 감싸서 반환한다. 마우스 좌표는 canvas.mouse_pos,
+    canvas.to_game_coords로 게임 좌표로 바꿔서 쓴다.
+    scale은 창 크기 배율 (1이면 size, 0이면 데스크톱에 들어가는 가장 큰 정수배).
+    그린 Surface와 창 크기가 다르면 SDL이 화면에 표시할 때 한 번 nearest-neighbour로 확대하므로,
+    창이 커져도 그리는 비용은 그대로다. 창이 없는 headless 모드에서는 확대하지 않는다.
+    """
+    set_render_divisor(divisor)
+    target_size = (size[0] // divisor, size[1] // divisor)
+    if pygame.display.get_driver() == "dummy" or (scale == 1 and divisor == 1):
+        screen = pygame.display.set_mode(target_size)
+    else:
+        screen = pygame.display.set_mode(target_size, pygame.SCALED)
+        if scale >= 1:
+            try:
+                from pygame._sdl2.video import Window
+                Window.from_display_module().size = (size[0] * scale, size[1] * scale)
+            except (ImportError, AttributeError, pygame.error):
+                pass  # 창 크기를 바꿀 수 없으면 SCALED가 정한 (데스크톱에 맞는) 크기 사용
+    return Canvas(screen, divisor) if divisor > 1 else screen
+
+
+def spikes_visible(world):
+    """3스테이지: 버튼이 눌려 바닥이 생기면 가시를 숨김"""
+    return world.floor_button is None or not world.floor_button.pressed
+
+
+def draw_static_scene(surface, world):
+    """움직이지 않는 오브젝트 (고정 플랫폼, 가시) 그리기"""
+    for platform in world.platforms:
+        draw_rect(surface, PLATFORM_COLOR, platform)
+    if spikes_visible(world):
+        for spike in world.spikes:
+            spike.draw(surface)
+
+
+class StaticLayer:
+    """배경색 + 고정 플랫폼 + 가시를 한 장의 Surface에 미리 그려두고 매 프레임 한 번에 blit
+
+    스테이지가 바뀌거나 고정 오브젝트가 바뀌면 (3스테이지 버튼 바닥) 다시 그린다.
+    움직이는 발판, 플레이어, 열쇠, 문 같은 동적 오브젝트는 그 위에 따로 그린다.
+    """
+    def __init__(self, size, background=BACKGROUND_COLOR):
+        self.size = size
+        self.background = background
+        self.surface = None
+        self.signature = None
+        self.builds = 0  # 다시 그린 횟수 (디버그용)
+
+    @staticmethod
+    def signature_for(world):
+        """고정 레이어 내용을 결정하는 값 (이 값이 바뀔 때만 다시 그림)
+
+        World가 바뀌거나 (스테이지 이동) World.static_version이 올라가면 (버튼 바닥, 가시 표시) 다시 그린다.
+        매 프레임 부르므로 플랫폼 목록을 복사하지 않는다.
+        """
+        return (world, world.static_version)
+
+    def build(self, world):
+        if self.surface is None:
+            self.surface = new_surface(self.size)
+        self.surface.fill(self.background)
+        draw_static_scene(self.surface, world)
+        self.signature = self.signature_for(world)
+        self.builds += 1
+
+    def draw(self, screen, world):
+        """화면 전체를 고정 레이어로 덮어씀 (screen.fill 대신 사용)"""
+        if self.surface is None or self.signature_for(world) != self.signature:
+            self.build(world)
+        screen.blit(self.surface, (0, 0))
+
+    def invalidate(self):
+        self.signature = None
+
+
+def merge_rects(rects, bounds):
+    """겹치는 Rect를 합치고 bounds 밖은 잘라낸 리스트 (빈 Rect는 버림)"""
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+        # 새 Rect와 겹치는 것들을 계속 합침 (합친 결과가 다른 것과 새로 겹칠 수 있음)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    """바뀐 오브젝트가 있던 영역과 새로 그려질 영역만 다시 그리고, 그 영역만 화면에 반영
+
+    매 프레임 동적 오브젝트 목록 [(모양 상태, 그리는 영역 Rect)]을 받아 이전 프레임과 비교한다.
+    상태나 영역이 바뀐 오브젝트의 이전/현재 영역 (걸친 오브젝트 전체 포함)만 고정 레이어로 지우고,
+    그 영역에 clip을 건 채로 동적 오브젝트 전체를 다시 그린다 (겹친 오브젝트도 같은 순서로 그려져서
+    전체를 다시 그린 것과 같음).
+    """
+    def __init__(self, static_layer):
+        self.static_layer = static_layer
+        self.items = None  # 이전 프레임의 [(상태, Rect)] (None이면 다음 프레임은 화면 전체)
+
+    def invalidate(self):
+        """다음 프레임은 화면 전체를 다시 그림 (다른 화면이나 오버레이가 그려졌을 때)"""
+        self.items = None
+
+    @staticmethod
+    def grow_to_objects(dirty, object_rects, bounds):
+        """다시 그릴 영역이 걸친 오브젝트 전체를 포함하도록 넓힘
+
+        테두리가 있는 pygame.draw.rect는 clip 경계에 테두리를 그리므로 오브젝트가 clip에
+        잘리면 전체를 그린 것과 결과가 달라진다.
+        """
+        dirty = merge_rects(dirty, bounds)
+        while True:
+            grown = []
+            for rect in dirty:
+                for index in rect.collidelistall(object_rects):
+                    rect = rect.union(object_rects[index])
+                grown.append(rect)
+            grown = merge_rects(grown, bounds)
+            if grown == dirty:
+                return dirty
+            dirty = grown
+
+    def draw(self, screen, world, items, draw_dynamic):
+        """이번 프레임 그리기. draw_dynamic(screen)은 동적 오브젝트를 그리는 함수.
+
+        pygame.display.update()에 넘길 Rect 리스트 반환. 영역 계산은 실제로 그리는 Surface 좌표로
+        하므로 (Canvas면 축소 해상도) 반환한 Rect도 그 좌표다.
+        """
+        layer = self.static_layer
+        previous = self.items
+        self.items = items
+        target = target_surface(screen)
+        if (previous is None or len(previous) != len(items) or layer.surface is None
+                or layer.signature_for(world) != layer.signature):
+            layer.draw(screen, world)
+            draw_dynamic(screen)
+            return [target.get_rect()]
+
+        dirty = []
+        for (old_state, old_rect), (state, rect) in zip(previous, items):
+            if old_state != state or old_rect != rect:
+                dirty.append(target_rect(screen, old_rect))
+                dirty.append(target_rect(screen, rect))
+        object_rects = [target_rect(screen, rect) for _, rect in items]
+        dirty = self.grow_to_objects(dirty, object_rects, target.get_rect())
+        layer_surface = target_surface(layer.surface)
+        for rect in dirty:
+            target.set_clip(rect)
+            target.blit(layer_surface, rect, rect)
+            draw_dynamic(screen)
+        target.set_clip(None)
+        return dirty
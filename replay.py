@@ -0,0 +1,248 @@
+import argparse
+import bisect
+import os
+import struct
+import sys
+import time
+
+from simulation import World, KeyState, PLAYER_KEYS, TICK_SECONDS, inputs_from_keys
+from batch_physics import numpy_available
+
+
+# 파일 형식: 헤더 + (반복 틱 수, 입력 비트마스크) 구간 리스트 (리틀 엔디언)
+REPLAY_MAGIC = b"DNDR"
+REPLAY_VERSION = 1
+HEADER_FORMAT = "<4sBBBI"  # 매직, 버전, 스테이지, 플레이어 수, 전체 틱 수
+RUN_FORMAT = "<HH"  # 구간 길이, 입력 비트마스크
+MAX_RUN_LENGTH = 0xFFFF
+
+# 한 플레이어의 입력이 차지하는 비트 수 (왼쪽, 오른쪽, 위, 상호작용)
+BITS_PER_PLAYER = 4
+# 동기화 스테이지의 문 상호작용은 플레이어 수와 관계없이 모든 키 세트를 읽으므로 항상 전부 기록
+RECORDED_PLAYERS = len(PLAYER_KEYS)
+
+
+def pack_inputs(inputs):
+    """플레이어별 입력 비트마스크 리스트를 하나의 정수로 합침"""
+    mask = 0
+    for index, player_mask in enumerate(inputs):
+        mask |= (player_mask & 0xF) << (BITS_PER_PLAYER * index)
+    return mask
+
+
+def unpack_inputs(mask, count=RECORDED_PLAYERS):
+    """pack_inputs의 반대"""
+    return [(mask >> (BITS_PER_PLAYER * index)) & 0xF for index in range(count)]
+
+
+class InputRecorder:
+    """틱마다 게임이 실제로 읽는 키를 비트마스크로 기록 (같은 입력이 이어지면 구간으로 압축)"""
+    def __init__(self, stage, player_count):
+        self.stage = stage
+        self.player_count = player_count
+        self.runs = []  # [반복 틱 수, 입력 비트마스크]
+        self.ticks = 0
+
+    def record(self, keys):
+        """이번 틱의 키 상태 기록 (keys는 World.step에 넘긴 것과 같은 객체)"""
+        self.record_mask(pack_inputs(inputs_from_keys(keys, RECORDED_PLAYERS)))
+
+    def record_mask(self, mask):
+        if self.runs and self.runs[-1][1] == mask and self.runs[-1][0] < MAX_RUN_LENGTH:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        self.ticks += 1
+
+    def to_replay(self):
+        return Replay(self.stage, self.player_count, [tuple(run) for run in self.runs])
+
+    def save(self, path):
+        self.to_replay().save(path)
+
+
+class Replay:
+    """기록된 입력 (스테이지, 플레이어 수, 구간 리스트)"""
+    def __init__(self, stage, player_count, runs):
+        self.stage = stage
+        self.player_count = player_count
+        self.runs = runs
+        # 각 구간이 시작하는 틱 (특정 틱의 입력을 이진 탐색으로 찾기 위해)
+        self.run_starts = []
+        tick = 0
+        for count, _ in runs:
+            self.run_starts.append(tick)
+            tick += count
+        self.ticks = tick
+
+    def to_bytes(self):
+        data = [struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.stage, self.player_count, self.ticks)]
+        data.extend(struct.pack(RUN_FORMAT, count, mask) for count, mask in self.runs)
+        return b"".join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, stage, player_count, ticks = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("리플레이 파일 형식이 아닙니다")
+        offset = struct.calcsize(HEADER_FORMAT)
+        runs = list(struct.iter_unpack(RUN_FORMAT, data[offset:]))
+        replay = cls(stage, player_count, runs)
+        if replay.ticks != ticks:
+            raise ValueError("리플레이 파일이 손상되었습니다 (틱 수 불일치)")
+        return replay
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def mask_at(self, tick):
+        """tick번째 틱의 입력 비트마스크"""
+        index = bisect.bisect_right(self.run_starts, tick) - 1
+        return self.runs[index][1]
+
+    def keys_at(self, tick):
+        return KeyState.from_inputs(unpack_inputs(self.mask_at(tick)))
+
+
+class ReplayPlayer:
+    """리플레이를 World에 다시 입력하며 재생 (제한 없는 속도 또는 실시간, 특정 틱으로 이동)"""
+    def __init__(self, replay, batch_physics=False):
+        self.replay = replay
+        self.batch_physics = batch_physics
+        self.world = None
+        self.restart()
+
+    def restart(self):
+        self.world = World(self.replay.stage, None, self.replay.player_count, batch_physics=self.batch_physics)
+        self.run_index = 0
+        self.run_offset = 0
+        self.keys = None
+
+    @property
+    def tick(self):
+        return self.world.tick
+
+    @property
+    def finished(self):
+        return self.world.tick >= self.replay.ticks or self.world.cleared
+
+    def step(self):
+        """한 틱 재생하고 World 이벤트 반환"""
+        count, mask = self.replay.runs[self.run_index]
+        if self.run_offset == 0:
+            self.keys = KeyState.from_inputs(unpack_inputs(mask))
+        events = self.world.step(self.keys)
+        self.run_offset += 1
+        if self.run_offset >= count:
+            self.run_index += 1
+            self.run_offset = 0
+        return events
+
+    def seek(self, tick):
+        """tick까지 진행 (이미 지났으면 처음부터 다시 진행)"""
+        tick = min(tick, self.replay.ticks)
+        if tick < self.world.tick:
+            self.restart()
+        while self.world.tick < tick and not self.world.cleared:
+            self.step()
+
+    def play(self, realtime=False, until=None, on_tick=None):
+        """끝(또는 until 틱)까지 재생. realtime=True면 60Hz에 맞춰 재생, on_tick(world, events)는 매 틱 호출"""
+        end = self.replay.ticks if until is None else min(until, self.replay.ticks)
+        start_time = time.perf_counter()
+        start_tick = self.world.tick
+        while self.world.tick < end and not self.world.cleared:
+            events = self.step()
+            if on_tick is not None:
+                on_tick(self.world, events)
+            if realtime:
+                delay = start_time + (self.world.tick - start_tick) * TICK_SECONDS - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        return self.world
+
+
+def player_states(world):
+    """플레이어별 (x, y, vel_y, on_ground)"""
+    return [(p.x, p.y, p.vel_y, p.on_ground) for p in world.active_players]
+
+
+def find_batch_divergence(replay):
+    """리플레이를 일반 물리(Player.update)와 BatchPhysics로 같이 재생해서 플레이어 상태가
+    처음 달라진 틱과 두 상태 반환 (끝까지 같으면 None)"""
+    scalar = ReplayPlayer(replay)
+    batch = ReplayPlayer(replay, batch_physics=True)
+    while not scalar.finished:
+        scalar.step()
+        batch.step()
+        if player_states(scalar.world) != player_states(batch.world):
+            return scalar.tick, player_states(scalar.world), player_states(batch.world)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 입력 리플레이 재생")
+    parser.add_argument("replay", help="리플레이 파일 (.dndr)")
+    parser.add_argument("--realtime", action="store_true", help="60Hz 실시간으로 재생 (기본: 제한 없는 속도)")
+    parser.add_argument("--seek", type=int, default=0, help="이 틱까지 빠르게 넘긴 뒤 재생")
+    parser.add_argument("--show", action="store_true", help="게임 창에 그리면서 재생 (--realtime 포함)")
+    parser.add_argument("--check-batch", action="store_true",
+                        help="일반 물리와 BatchPhysics(NumPy)로 같이 재생해서 플레이어 궤적이 같은지 검사")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    if args.check_batch:
+        if not numpy_available():
+            parser.error("--check-batch에는 numpy가 필요합니다 (pip install numpy)")
+        divergence = find_batch_divergence(replay)
+        if divergence is None:
+            print(f"stage {replay.stage} x{replay.player_count}: batch physics MATCH")
+            return 0
+        tick, scalar_states, batch_states = divergence
+        print(f"stage {replay.stage} x{replay.player_count}: batch physics DIVERGED at tick {tick}")
+        print(f"  Player.update: {scalar_states}")
+        print(f"  BatchPhysics:  {batch_states}")
+        return 1
+    player = ReplayPlayer(replay)
+    player.seek(args.seek)
+
+    on_tick = None
+    if args.show:
+        import pygame
+        from config import WIDTH, HEIGHT, TITLE, BACKGROUND_COLOR
+        from main import draw_game_scene, get_english_font
+        from renderer import StaticLayer, create_display
+
+        pygame.display.init()  # 소리는 쓰지 않으므로 믹서는 초기화하지 않음
+        pygame.font.init()
+        screen = create_display((WIDTH, HEIGHT))
+        pygame.display.set_caption(f"{TITLE} - {os.path.basename(args.replay)}")
+        font = get_english_font(36)
+        static_layer = StaticLayer((WIDTH, HEIGHT), BACKGROUND_COLOR)
+
+        def draw_tick(world, events):
+            pygame.event.pump()
+            draw_game_scene(screen, world, font, static_layer=static_layer)
+            pygame.display.update()
+        on_tick = draw_tick
+
+    start = time.perf_counter()
+    start_tick = player.tick
+    world = player.play(realtime=args.realtime or args.show, on_tick=on_tick)
+    seconds = time.perf_counter() - start
+    played = world.tick - start_tick
+    outcome = "CLEAR" if world.cleared else "-"
+    print(f"stage {replay.stage} x{replay.player_count}: {outcome} ticks={world.tick}/{replay.ticks} deaths={world.deaths}")
+    if seconds > 0:
+        print(f"{played} ticks in {seconds:.3f}s ({played / seconds:.0f} ticks/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
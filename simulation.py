@@ -0,0 +1,353 @@
+import pygame
+
+from config import FPS
+from entities import SyncedPlayer, Spike, FloorButton
+from stages import create_stage_objects
+from spatial import SpatialGrid
+from batch_physics import BatchPhysics
+from triggers import TriggerIndex, TRIGGER_SPIKE, TRIGGER_KEY, TRIGGER_DOOR, TRIGGER_BUTTON
+
+
+# 고정 타임스텝 (초당 60틱)
+TICK_RATE = FPS
+TICK_SECONDS = 1.0 / TICK_RATE
+
+# 플레이어 한 명의 입력 비트마스크
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_INTERACT = 8
+
+# 플레이어 인덱스별 (왼쪽, 오른쪽, 위, 상호작용) 키
+PLAYER_KEYS = [
+    (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN),  # 플레이어 1: 방향키
+    (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s),  # 플레이어 2: WASD
+    (pygame.K_j, pygame.K_l, pygame.K_i, pygame.K_k),  # 플레이어 3: IJKL
+]
+
+# step()이 반환하는 이벤트
+EVENT_KEY_COLLECTED = "key_collected"
+EVENT_DOOR_OPENED = "door_opened"
+EVENT_DIED = "died"
+EVENT_CLEARED = "cleared"
+
+# 3스테이지 버튼을 누르면 생기는 바닥 (뚫려있는 곳 400~560 사이)
+GAP_PLATFORM = (400, 580, 160, 60)
+
+
+class KeyState:
+    """pygame.key.get_pressed() 대신 쓸 수 있는 키 상태 (디스플레이 없이 사용)"""
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+    @classmethod
+    def from_inputs(cls, inputs):
+        """플레이어별 입력 비트마스크 리스트로 키 상태 생성"""
+        pressed = []
+        for index, mask in enumerate(inputs):
+            for bit, key in enumerate(PLAYER_KEYS[index]):
+                if mask & (1 << bit):
+                    pressed.append(key)
+        return cls(pressed)
+
+
+def inputs_from_keys(keys, player_count):
+    """키 상태에서 플레이어별 입력 비트마스크 리스트 추출"""
+    inputs = []
+    for index in range(player_count):
+        mask = 0
+        for bit, key in enumerate(PLAYER_KEYS[index]):
+            if keys[key]:
+                mask |= 1 << bit
+        inputs.append(mask)
+    return inputs
+
+
+class World:
+    """스테이지 하나의 게임 로직 (디스플레이, 믹서, 폰트 없이 동작)
+
+    batch_physics=True면 일반 플레이어 물리를 BatchPhysics(NumPy)로 한 번에 계산한다.
+    tick_rate를 낮추면 한 틱에 60Hz 기준 여러 틱만큼(dt) 이동한다 (충돌은 swept AABB로 처리).
+    """
+    def __init__(self, stage, player_colors=None, player_count=2, batch_physics=False, tick_rate=TICK_RATE):
+        self.stage = stage
+        self.player_colors = player_colors
+        self.player_count = player_count
+        self.batch_physics = batch_physics
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        # 한 틱 동안 진행할 시간 (60Hz 틱 단위, 속도/중력이 60Hz 기준이므로)
+        self.dt = TICK_RATE / tick_rate
+        self.tick = 0
+        self.deaths = 0
+        self.cleared = False
+        self._create_objects()
+        # 처음 상태 스냅샷 (죽거나 재시작할 때 오브젝트를 다시 만들지 않고 이 상태로 복원)
+        self.initial_snapshot = self.snapshot()
+
+    def _create_objects(self):
+        """스테이지 오브젝트 생성"""
+        stage_result = create_stage_objects(self.stage, self.player_colors, self.player_count)
+        self.players, self.key_obj, self.door_obj, platforms, self.moving_platforms = stage_result[:5]
+        # 3스테이지 바닥이 추가/제거되므로 스테이지 데이터 리스트를 복사해서 사용
+        self.platforms = list(platforms)
+        self.spikes = []
+        self.floor_button = None
+        for extra in stage_result[5:]:
+            if isinstance(extra, Spike):
+                self.spikes.append(extra)
+            elif isinstance(extra, FloorButton):
+                self.floor_button = extra
+            elif extra:
+                self.spikes.extend(extra)
+        # 충돌 검사용 공간 격자: 고정 플랫폼 + 움직이는 발판 + (3스테이지) 버튼 바닥
+        self.platform_grid = SpatialGrid.from_rects(self.platforms)
+        self.moving_platform_handles = [self.platform_grid.insert(p.rect()) for p in self.moving_platforms]
+        self.gap_platform_handle = None
+        # 고정 레이어 (고정 플랫폼, 가시) 내용이 바뀔 때마다 올라가는 번호 (renderer.StaticLayer가 비교)
+        self.static_version = 0
+        self.static_state = (False, self.floor_button is not None and self.floor_button.pressed)
+        self.active_players = self.players[:self.player_count]
+        self.door_obj.reset_interactions(self.active_players)
+        # 가시, 열쇠, 문, 버튼 트리거 영역 (매 틱 모든 오브젝트를 검사하는 대신 영역 안의 플레이어만 처리)
+        self.triggers = TriggerIndex()
+        for spike in self.spikes:
+            self.triggers.add(spike.rect(), TRIGGER_SPIKE, spike)
+        self.key_volume = self.triggers.add(self.key_obj.rect(), TRIGGER_KEY, self.key_obj)
+        self.door_volume = self.triggers.add(self.door_obj.rect(), TRIGGER_DOOR, self.door_obj)
+        self.button_volume = None
+        if self.floor_button is not None:
+            self.button_volume = self.triggers.add(self.floor_button.rect(), TRIGGER_BUTTON, self.floor_button)
+        self.triggers.update(self.active_players)
+        # 배치 물리 엔진 (동기화된 플레이어는 한 명뿐이므로 사용하지 않음)
+        self.batch = None
+        if self.batch_physics and not self.synced:
+            self.batch = BatchPhysics.from_players(self.active_players)
+            self.batch.set_platforms(self.platform_grid)
+        self.previous_key_collected = False
+        self.previous_door_open = False
+
+    def reset(self):
+        """스테이지 오브젝트를 처음 상태로 되돌림 (틱, 죽은 횟수는 유지)"""
+        self._restore_objects(self.initial_snapshot[5])
+        self.previous_key_collected = False
+        self.previous_door_open = False
+
+    def restart(self):
+        """틱, 죽은 횟수까지 포함해서 스테이지를 처음 상태로 되돌림"""
+        self.restore(self.initial_snapshot)
+
+    def snapshot(self):
+        """변하는 상태 전부를 기본 자료형 튜플로 저장 (restore로 되돌릴 수 있음)"""
+        return (self.tick, self.deaths, self.cleared, self.previous_key_collected, self.previous_door_open,
+                self._capture_objects())
+
+    def restore(self, snapshot):
+        """snapshot()으로 저장한 상태로 되돌림"""
+        (self.tick, self.deaths, self.cleared, self.previous_key_collected, self.previous_door_open,
+         objects) = snapshot
+        self._restore_objects(objects)
+
+    def _capture_objects(self):
+        players = tuple((p.x, p.y, p.vel_y, p.on_ground, p.has_key, p.interacted_with_door, p.entered_door)
+                        for p in self.active_players)
+        platforms = tuple((p.phase, p.last_phase) for p in self.moving_platforms)
+        button = self.floor_button.pressed if self.floor_button is not None else False
+        return (players, platforms, self.key_obj.collected, self.key_obj.attached_to_player,
+                self.door_obj.open, button, self.gap_platform_handle is not None)
+
+    def _restore_objects(self, objects):
+        players, platforms, key_collected, key_attached, door_open, button, gap_platform = objects
+        for player, state in zip(self.active_players, players):
+            (player.x, player.y, player.vel_y, player.on_ground, player.has_key,
+             player.interacted_with_door, player.entered_door) = state
+        for platform, (phase, last_phase) in zip(self.moving_platforms, platforms):
+            platform.seek(phase, last_phase)
+        self.key_obj.collected = key_collected
+        self.key_obj.attached_to_player = key_attached
+        self.door_obj.open = door_open
+        if self.floor_button is not None:
+            self.floor_button.pressed = button
+        self._set_gap_platform(gap_platform)
+        self._rebin_moving_platforms()
+        self.triggers.clear()
+        self.triggers.update(self.active_players)
+
+    @property
+    def synced(self):
+        """4, 6스테이지처럼 모든 플레이어가 하나의 캐릭터를 조종하는지 여부"""
+        return len(self.active_players) > 0 and isinstance(self.active_players[0], SyncedPlayer)
+
+    def step(self, keys):
+        """한 틱 진행하고 발생한 이벤트 리스트 반환 (keys는 키 코드로 인덱싱 가능한 객체)"""
+        events = []
+        self.tick += 1
+
+        if self.synced:
+            self._update_synced_player(keys)
+        else:
+            self._update_players(keys)
+
+        # 트리거 영역에 플레이어 위치 반영 (영역 경계를 넘은 플레이어만 다시 계산)
+        triggers = self.triggers
+        triggers.update(self.active_players)
+
+        if not self.key_obj.collected:
+            self.key_obj.update(triggers.occupants(self.key_volume))
+        # 열쇠 획득
+        if self.key_obj.collected and not self.previous_key_collected:
+            events.append(EVENT_KEY_COLLECTED)
+        self.previous_key_collected = self.key_obj.collected
+
+        door_occupants = triggers.occupants(self.door_volume)
+        self.door_obj.update(door_occupants)
+        # 문 열림
+        if self.door_obj.open and not self.previous_door_open:
+            events.append(EVENT_DOOR_OPENED)
+        self.previous_door_open = self.door_obj.open
+
+        # 가시 충돌 체크 (게임 오버: 스테이지 리셋)
+        if triggers.occupied(TRIGGER_SPIKE):
+            self.deaths += 1
+            self.reset()
+            events.append(EVENT_DIED)
+            return events
+
+        # 버튼 업데이트: 버튼이 눌려있으면 바닥 생성 (뚫려있는 곳 매꾸기)
+        if self.floor_button is not None:
+            self.floor_button.update(triggers.occupants(self.button_volume))
+            self._set_gap_platform(self.floor_button.pressed)
+
+        # 문과의 상호작용 체크 (지속적으로)
+        self.door_obj.check_interaction(door_occupants, keys)
+
+        # 열쇠를 가진 플레이어가 없으면 열쇠는 더 이상 붙어있지 않음
+        any_has_key = any(p.has_key for p in self.active_players)
+        if self.key_obj.collected and not any_has_key:
+            self.key_obj.attached_to_player = False
+
+        # 모든 플레이어가 문과 상호작용했는지 확인
+        if self.door_obj.all_players_interacted(self.active_players):
+            self.cleared = True
+            # 다음 스테이지 준비를 위해 상호작용 상태 초기화
+            self.door_obj.reset_interactions(self.active_players)
+            events.append(EVENT_CLEARED)
+        return events
+
+    def advance(self, keys, ticks):
+        """같은 입력으로 여러 틱 진행 (클리어하면 중단), 모든 이벤트 반환"""
+        events = []
+        for _ in range(ticks):
+            events.extend(self.step(keys))
+            if self.cleared:
+                break
+        return events
+
+    def players_at_door(self):
+        """문과 겹쳐있는 플레이어 리스트"""
+        return self.triggers.occupants(self.door_volume)
+
+    def _set_gap_platform(self, present):
+        """3스테이지 버튼 바닥 추가/제거 (버튼을 누르거나 뗄 때마다 호출되므로 고정 레이어 버전도 여기서 갱신)"""
+        if present and self.gap_platform_handle is None:
+            self.platforms.append(pygame.Rect(GAP_PLATFORM))
+            self.gap_platform_handle = self.platform_grid.insert(GAP_PLATFORM)
+        elif not present and self.gap_platform_handle is not None:
+            self.platforms = [p for p in self.platforms if tuple(p) != GAP_PLATFORM]
+            self.platform_grid.remove(self.gap_platform_handle)
+            self.gap_platform_handle = None
+        if self.batch is not None:
+            self.batch.set_platforms(self.platform_grid)
+        self._update_static_version()
+
+    def _update_static_version(self):
+        """버튼 바닥 유무나 가시 표시 여부 (버튼이 눌리면 숨김)가 바뀌었으면 static_version을 올림"""
+        state = (self.gap_platform_handle is not None,
+                 self.floor_button is not None and self.floor_button.pressed)
+        if state != self.static_state:
+            self.static_state = state
+            self.static_version += 1
+
+    def _rebin_moving_platforms(self):
+        """움직이는 발판의 현재 위치를 공간 격자에 반영"""
+        for platform, handle in zip(self.moving_platforms, self.moving_platform_handles):
+            self.platform_grid.update(handle, platform.rect())
+
+    def _carry_standing_players(self, players):
+        """발판 위에 서 있는 플레이어를 발판이 이동한 만큼 함께 이동"""
+        for player in players:
+            player_rect = player.rect()
+            for platform in self.moving_platforms:
+                platform_rect = platform.rect()
+                # 플레이어가 발판 위에 있는지 확인 (발판의 위쪽 가장자리에 플레이어가 서 있는 경우)
+                if (player_rect.colliderect(platform_rect) and
+                    abs(player_rect.bottom - platform_rect.top) < 5 and
+                    player.on_ground):
+                    player.y += platform.get_movement_delta()
+
+    def _carry_overlapping_players(self, players):
+        """점프 직후에도 발판과 겹쳐있으면 발판과 함께 이동 (가장자리에서 점프할 때)"""
+        for player in players:
+            player_rect = player.rect()
+            for platform in self.moving_platforms:
+                platform_rect = platform.rect()
+                if (player_rect.colliderect(platform_rect) and
+                    player_rect.left < platform_rect.right and
+                    player_rect.right > platform_rect.left):
+                    movement_delta = platform.get_movement_delta()
+                    if abs(movement_delta) > 0.1:  # 발판이 실제로 움직였을 때만
+                        player.y += movement_delta
+                        # 플레이어가 발판 위에 서 있는 경우에만 on_ground 유지
+                        if abs(player_rect.bottom - platform_rect.top) < 5:
+                            player.on_ground = True
+
+    def _update_synced_player(self, keys):
+        """4, 6스테이지: 모든 플레이어의 입력이 같을 때만 움직이는 캐릭터 처리"""
+        # 모든 플레이어의 키 입력을 수집
+        all_players_keys = []
+        for index in range(self.player_count):
+            all_players_keys.append({key: keys[key] for key in PLAYER_KEYS[index]})
+
+        # 움직이는 발판 업데이트 (플레이어 업데이트 전에)
+        for platform in self.moving_platforms:
+            platform.update(self.dt)
+        player = self.active_players[0]
+        self._carry_standing_players([player])
+
+        # 움직이는 발판을 플랫폼으로 추가 (발판 업데이트 후 위치)
+        self._rebin_moving_platforms()
+        player.update(keys, self.platform_grid, None, all_players_keys, self.dt)
+        self._carry_overlapping_players([player])
+
+    def _update_players(self, keys):
+        """일반 스테이지: 각 플레이어가 자기 키로 움직임"""
+        # 움직이는 발판도 플랫폼으로 추가 (발판 업데이트 전 위치)
+        self._rebin_moving_platforms()
+
+        # 움직이는 발판 업데이트 (플레이어 업데이트 전에)
+        for platform in self.moving_platforms:
+            platform.update(self.dt)
+        self._carry_standing_players(self.active_players)
+
+        if self.batch is not None:
+            self._update_players_batched(keys)
+        else:
+            # 플레이어 간 충돌 처리를 위해 다른 플레이어 리스트 전달
+            for i, player in enumerate(self.active_players):
+                other_players = [p for j, p in enumerate(self.active_players) if j != i]
+                player.update(keys, self.platform_grid, other_players, dt=self.dt)
+        self._carry_overlapping_players(self.active_players)
+
+    def _update_players_batched(self, keys):
+        """모든 플레이어의 물리를 BatchPhysics로 한 번에 계산"""
+        players = self.active_players
+        if self.moving_platforms:
+            self.batch.set_platforms(self.platform_grid)
+        self.batch.load_players(players)
+        self.batch.step([keys[p.key_left] for p in players],
+                        [keys[p.key_right] for p in players],
+                        [keys[p.key_up] for p in players], self.dt)
+        self.batch.store_players(players)
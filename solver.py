@@ -0,0 +1,308 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from config import MAX_STAGE, HEIGHT
+from simulation import (World, KeyState, EVENT_DIED,
+                        INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_INTERACT)
+from batch_runner import run_job
+from replay import InputRecorder
+
+
+# 한 플레이어가 한 번에 고를 수 있는 입력 (MACRO_TICKS 틱 동안 유지)
+MACRO_INPUTS = [
+    0,
+    INPUT_LEFT,
+    INPUT_RIGHT,
+    INPUT_UP,
+    INPUT_LEFT | INPUT_UP,
+    INPUT_RIGHT | INPUT_UP,
+    INPUT_INTERACT,
+    INPUT_LEFT | INPUT_INTERACT,
+    INPUT_RIGHT | INPUT_INTERACT,
+]
+MACRO_TICKS = 8  # 입력 하나를 유지하는 틱 수 (작을수록 정밀하지만 탐색 공간이 커짐)
+
+# 방문한 상태를 구분할 때 좌표/속도를 몇 단위로 묶을지
+POSITION_QUANTUM = 4
+VELOCITY_QUANTUM = 1
+
+DEFAULT_MAX_STATES = 200000
+
+
+# 프로세스마다 (스테이지, 플레이어 수)별로 하나씩 만들어 두고 스냅샷을 복원해서 재사용하는 World
+_worlds = {}
+
+
+def _world_for(stage, player_count):
+    world = _worlds.get((stage, player_count))
+    if world is None:
+        world = _worlds[(stage, player_count)] = World(stage, None, player_count)
+    return world
+
+
+def state_key(world, position_quantum=POSITION_QUANTUM, velocity_quantum=VELOCITY_QUANTUM):
+    """방문 여부를 판단할 양자화된 World 상태 (같은 키면 같은 상태로 간주)"""
+    players = tuple(
+        (int(p.x // position_quantum), int(p.y // position_quantum), int(p.vel_y // velocity_quantum),
+         p.on_ground, p.has_key, p.entered_door)
+        for p in world.active_players
+    )
+    platforms = tuple((int(p.y // position_quantum), p.direction) for p in world.moving_platforms)
+    button = world.floor_button.pressed if world.floor_button is not None else False
+    return (players, platforms, world.key_obj.collected, world.door_obj.open, button)
+
+
+def exact_state_key(world):
+    """방문 여부를 판단할 양자화하지 않은 World 상태 전체
+
+    같은 키면 앞으로의 진행도 완전히 같으므로 이 키로 합쳐도 도달할 수 있는 상태를 잃지 않는다
+    (틱 수와 죽은 횟수는 진행에 영향이 없어서 제외). 움직이는 발판의 phase는 계속 커지므로
+    왕복 주기로 줄이고 last_phase는 phase와의 차이로 저장한다 (한 주기 뒤의 같은 상태를 합치도록).
+    """
+    _tick, _deaths, _cleared, key_collected, door_open, objects = world.snapshot()
+    players, platforms, *rest = objects
+    platforms = tuple((platform.periodic_phase(phase), phase - last_phase)
+                      for platform, (phase, last_phase) in zip(world.moving_platforms, platforms))
+    return (key_collected, door_open, players, platforms, *rest)
+
+
+def fell_off(world):
+    """바닥 없이 화면 맨 아래까지 떨어진 플레이어가 있는지 (다시 올라올 수 없는 상태)"""
+    return any(not p.entered_door and p.y >= HEIGHT - p.h for p in world.active_players)
+
+
+def heuristic(world):
+    """클리어까지 남은 이동 거리 추정 (모든 플레이어가 문까지 + 문이 닫혀있으면 열쇠를 문까지)"""
+    door = world.door_obj.rect()
+    players = [p for p in world.active_players if not p.entered_door]
+
+    def distance(rect, other):
+        return abs(rect.centerx - other.centerx) + abs(rect.centery - other.centery)
+
+    remaining = sum(distance(p.rect(), door) for p in players)
+    if world.door_obj.open:
+        return remaining
+    if world.key_obj.collected:
+        holders = [p for p in players if p.has_key] or players
+        return remaining + min(distance(p.rect(), door) for p in holders)
+    key = world.key_obj.rect()
+    return remaining + min(distance(p.rect(), key) for p in players) + distance(key, door)
+
+
+def available_actions(world):
+    """현재 상태에서 의미 있는 입력 조합 리스트 (플레이어별 비트마스크 튜플)
+
+    동기화 스테이지는 모든 플레이어가 같은 입력을 해야 움직이므로 같은 입력만,
+    일반 스테이지는 문에 들어간 플레이어는 입력 없음, 문이 닫혀있으면 상호작용 없음.
+    """
+    inputs = MACRO_INPUTS if world.door_obj.open else [mask for mask in MACRO_INPUTS if not mask & INPUT_INTERACT]
+    if world.synced:
+        return [(mask,) * world.player_count for mask in inputs]
+    actions = [()]
+    for player in world.active_players:
+        choices = [0] if player.entered_door else inputs
+        actions = [action + (mask,) for action in actions for mask in choices]
+    return actions
+
+
+def expand_states(stage, player_count, states, macro_ticks=MACRO_TICKS, exact=False):
+    """World 스냅샷 여러 개를 가능한 모든 입력으로 macro_ticks틱씩 진행 (프로세스 풀 작업 단위)
+
+    states는 [(번호, 스냅샷)]. [(부모 번호, 입력, 진행한 틱 수, 결과, 상태 키, 자식 스냅샷, heuristic)]
+    반환. 결과는 "cleared" 또는 "ok"이고 (죽거나 떨어진 상태는 버림) 클리어한 상태는 스냅샷 없이 반환한다.
+    exact면 상태 키를 양자화하지 않는다 (exact_state_key).
+    """
+    world = _world_for(stage, player_count)
+    key_for = exact_state_key if exact else state_key
+    children = []
+    for index, snapshot in states:
+        world.restore(snapshot)
+        actions = available_actions(world)
+        seen = set()
+        for action in actions:
+            world.restore(snapshot)
+            keys = KeyState.from_inputs(action)
+            outcome = "ok"
+            ticks = 0
+            while ticks < macro_ticks:
+                ticks += 1
+                if EVENT_DIED in world.step(keys):
+                    outcome = "dead"
+                    break
+                if world.cleared:
+                    outcome = "cleared"
+                    break
+            if outcome == "ok" and fell_off(world):
+                outcome = "dead"
+            if outcome == "dead":
+                continue
+            if outcome == "cleared":
+                # 클리어한 틱 수가 다를 수 있으므로 상태 키로 합치지 않음
+                children.append((index, action, ticks, outcome, None, None, 0))
+                continue
+            key = key_for(world)
+            if key in seen:
+                continue
+            seen.add(key)
+            children.append((index, action, ticks, outcome, key, world.snapshot(), heuristic(world)))
+    return children
+
+
+def _chunks(items, count):
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def build_script(nodes, index):
+    """부모 포인터를 따라가 입력 스크립트 생성 ([틱 수, [플레이어별 비트마스크]] 구간, batch_runner 형식)"""
+    steps = []
+    while index is not None:
+        parent, action, ticks = nodes[index]
+        if action is not None:
+            steps.append((action, ticks))
+        index = parent
+    script = []
+    for action, ticks in reversed(steps):
+        if script and script[-1][1] == list(action):
+            script[-1][0] += ticks
+        else:
+            script.append([ticks, list(action)])
+    return script
+
+
+def solve(stage, player_count=2, macro_ticks=MACRO_TICKS, workers=None, beam=None,
+          max_states=DEFAULT_MAX_STATES, max_depth=None, verbose=False, exact=False):
+    """스테이지를 클리어할 수 있는 가장 짧은 입력 스크립트를 너비 우선으로 탐색
+
+    깊이는 입력 개수 (macro_ticks틱씩)지만 입력 도중에도 클리어할 수 있으므로, 처음 클리어한 깊이의
+    클리어 중 틱 수가 가장 적은 것을 고른다 (그보다 깊으면 틱 수가 더 많으므로, 상태 키로 합치거나 beam으로
+    버린 상태를 빼면 틱 기준으로도 가장 짧음).
+
+    beam을 주면 각 단계에서 heuristic 기준 상위 beam개 상태만 남긴다 (A*처럼 빠르지만
+    클리어 불가능을 증명하지는 못함). 결과 dict의 exhausted는 모든 상태를 다 봤는지인데,
+    기본 (양자화된 상태 키)에서는 서로 다른 상태가 하나로 합쳐져 버려지므로 클리어 불가능의
+    증거가 아니다. exact=True (양자화 없음)로 exhausted면 (MACRO_INPUTS를 macro_ticks틱씩
+    유지하는 입력 중에는) 클리어할 수 있는 입력이 없다.
+    """
+    start = time.perf_counter()
+    root = World(stage, None, player_count)
+    nodes = [(None, None, 0)]  # 번호 -> (부모 번호, 입력, 틱 수)
+    visited = {exact_state_key(root) if exact else state_key(root)}
+    frontier = [(0, root.snapshot())]
+    expand = partial(expand_states, stage, player_count, macro_ticks=macro_ticks, exact=exact)
+    depth = 0
+    solution = None
+    truncated = False
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while frontier and solution is None:
+            if max_depth is not None and depth >= max_depth:
+                truncated = True
+                break
+            if pool is not None and len(frontier) > 1:
+                batches = pool.map(expand, _chunks(frontier, workers * 4))
+            else:
+                batches = [expand(frontier)]
+            next_frontier = []
+            cleared = None  # 이번 깊이에서 가장 적은 틱에 클리어한 (부모 번호, 입력, 틱 수)
+            for children in batches:
+                for parent, action, ticks, outcome, key, child, estimate in children:
+                    if outcome == "cleared":
+                        if cleared is None or ticks < cleared[2]:
+                            cleared = (parent, action, ticks)
+                        continue
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                    nodes.append((parent, action, ticks))
+                    next_frontier.append((len(nodes) - 1, child, estimate))
+            depth += 1
+            if cleared is not None:
+                nodes.append(cleared)
+                solution = len(nodes) - 1
+                break
+            if beam is not None and len(next_frontier) > beam:
+                next_frontier.sort(key=lambda item: item[2])
+                next_frontier = next_frontier[:beam]
+                truncated = True
+            frontier = [(index, child) for index, child, _ in next_frontier]
+            if verbose:
+                print(f"  depth {depth}: frontier {len(frontier)}, states {len(visited)}", file=sys.stderr)
+            if len(visited) >= max_states and solution is None:
+                truncated = True
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    script = build_script(nodes, solution) if solution is not None else None
+    return {
+        "stage": stage,
+        "player_count": player_count,
+        "cleared": solution is not None,
+        "exhausted": solution is None and not truncated,
+        "exact": exact,
+        "ticks": sum(ticks for ticks, _ in script) if script else None,
+        "script": script,
+        "states": len(visited),
+        "depth": depth,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스테이지를 클리어할 수 있는지 입력 조합을 탐색")
+    parser.add_argument("stages", nargs="*", type=int, help="탐색할 스테이지 (기본: 전부)")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3], help="플레이어 수 (기본: 2 3)")
+    parser.add_argument("--macro-ticks", type=int, default=MACRO_TICKS, help="입력 하나를 유지하는 틱 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--beam", type=int, default=None, help="단계마다 남길 상태 수 (기본: 제한 없음)")
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES, help="방문할 최대 상태 수")
+    parser.add_argument("--max-depth", type=int, default=None, help="최대 탐색 깊이 (입력 개수)")
+    parser.add_argument("--save", metavar="DIR", help="찾은 입력을 리플레이(.dndr)로 저장할 폴더")
+    parser.add_argument("--verbose", action="store_true", help="탐색 깊이별 진행 상황 출력")
+    parser.add_argument("--exact", action="store_true",
+                        help="상태를 양자화하지 않고 탐색 (느리지만 다 탐색하면 클리어 불가능으로 판정)")
+    args = parser.parse_args(argv)
+
+    stages = args.stages or list(range(1, MAX_STAGE + 1))
+    unsolved = 0
+    for stage in stages:
+        for player_count in args.players:
+            result = solve(stage, player_count, args.macro_ticks, args.workers, args.beam,
+                           args.max_states, args.max_depth, args.verbose, args.exact)
+            if result["cleared"]:
+                # 찾은 입력을 새 World에서 다시 재생해서 확인
+                check = run_job({"stage": stage, "player_count": player_count, "script": result["script"]})
+                outcome = f"CLEAR in {result['ticks']} ticks" + ("" if check["cleared"] else " (replay mismatch!)")
+            elif result["exhausted"] and result["exact"]:
+                outcome = f"UNWINNABLE (exact search exhausted, inputs held {args.macro_ticks} ticks)"
+                unsolved += 1
+            elif result["exhausted"]:
+                # 양자화로 합쳐서 버린 상태 중에 클리어할 수 있는 것이 있을 수 있음
+                outcome = "NO SOLUTION FOUND at this quantization (not a proof, rerun with --exact)"
+                unsolved += 1
+            else:
+                outcome = "UNKNOWN (search limit reached)"
+                unsolved += 1
+            print(f"stage {stage} x{player_count}: {outcome}, {result['states']} states, "
+                  f"depth {result['depth']}, {result['seconds']:.1f}s")
+            if result["cleared"] and args.save:
+                os.makedirs(args.save, exist_ok=True)
+                recorder = InputRecorder(stage, player_count)
+                for ticks, inputs in result["script"]:
+                    keys = KeyState.from_inputs(inputs)
+                    for _ in range(ticks):
+                        recorder.record(keys)
+                recorder.save(os.path.join(args.save, f"stage{stage}_{player_count}p_solution.dndr"))
+    return 1 if unsolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,194 @@
 import pygame
 import os
+from collections import deque
+
+from assets import ASSET_LOADED_EVENT
+from audio_cache import AudioCache
+from config import AUDIO_CACHE_DIR
+
+
+# BGM 그룹 (게임 상태별 배경음악). sounds/bgm/<그룹>/ 폴더의 파일이 그 그룹의 곡이 되고,
+# sounds/bgm/ 바로 아래 파일은 전용 곡이 없는 그룹이 같이 쓰는 기본 곡
+BGM_DEFAULT = ""
+BGM_MENU = "menu"
+BGM_GAME = "game"
+BGM_CLEAR = "clear"
+BGM_FADE_MS = 800  # 곡을 바꿀 때 이전 곡을 줄이고 새 곡을 키우는 시간
+
+AUDIO_EXTENSIONS = ('.ogg', '.wav', '.mp3')
+
+# 효과음 채널 수와 효과음별 재생 설정: (동시에 재생할 최대 개수, 다시 재생할 최소 간격 ms, 우선순위)
+# 채널이 모자라면 우선순위가 같거나 낮은 효과음 중 가장 오래된 것을 끊고, 없으면 새 효과음을 버림
+SFX_CHANNELS = 8
+SFX_DEFAULT_SETTINGS = (2, 50, 0)
+SFX_SETTINGS = {
+    "enter": (2, 80, 1),  # 버튼 클릭, 문 열림
+    "itempickup": (3, 40, 2),  # 열쇠 획득
+}
+
+# NullSoundManager가 기록해두는 최근 재생 요청 수
+MAX_RECORDED_REQUESTS = 1000
+
+# pygame.mixer.music이 곡을 끝내거나 큐에 넣은 다음 곡으로 넘어갈 때 보내는 이벤트
+BGM_END_EVENT = pygame.event.custom_type()
+
+
+def find_bgm_tracks(bgm_dir):
+    """BGM 폴더에서 그룹별 파일 경로 리스트 {그룹: [경로]} 생성 (파일을 읽지 않고 경로만 모음)"""
+    catalog = {}
+    if not os.path.exists(bgm_dir):
+        return catalog
+    for name in sorted(os.listdir(bgm_dir)):
+        path = os.path.join(bgm_dir, name)
+        if os.path.isdir(path):
+            tracks = [os.path.join(path, filename) for filename in sorted(os.listdir(path))
+                      if filename.endswith(AUDIO_EXTENSIONS)]
+            if tracks:
+                catalog[name] = tracks
+        elif name.endswith(AUDIO_EXTENSIONS):
+            catalog.setdefault(BGM_DEFAULT, []).append(path)
+    return catalog
+
+
+class SfxChannelPool:
+    """효과음을 정해진 수의 채널에서만 재생 (효과음별 동시 재생 수, 재시작 간격, 우선순위 제한)
+
+    볼륨은 채널에 설정하므로 효과음 볼륨을 바꿀 때 Sound를 하나씩 바꾸지 않아도 된다.
+    """
+    def __init__(self, num_channels=SFX_CHANNELS, settings=SFX_SETTINGS):
+        self.num_channels = num_channels
+        self.settings = settings
+        self.volume = 1.0
+        self.channels = None  # 믹서 초기화가 끝난 뒤 처음 재생할 때 만듦
+        self.voices = [None] * num_channels  # 채널별로 마지막에 재생한 (이름, 우선순위, 시작 시각)
+        self.last_played = {}  # 이름 -> 마지막 재생 시각 (ms)
+    
+    def _get_channels(self):
+        if self.channels is None:
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.num_channels)]
+            for channel in self.channels:
+                channel.set_volume(self.volume)
+        return self.channels
+    
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.channels is not None:
+            for channel in self.channels:
+                channel.set_volume(volume)
+    
+    def _pick_channel(self, name, max_voices, priority):
+        """재생할 채널 번호 (재생할 수 없으면 None)"""
+        channels = self._get_channels()
+        playing = [i for i, channel in enumerate(channels) if channel.get_busy()]
+        # 같은 효과음이 최대 개수만큼 재생 중이면 그중 가장 오래된 것을 다시 씀
+        same = [i for i in playing if self.voices[i][0] == name]
+        if len(same) >= max_voices:
+            return min(same, key=lambda i: self.voices[i][2])
+        for i, channel in enumerate(channels):
+            if not channel.get_busy():
+                return i
+        # 빈 채널이 없으면 우선순위가 같거나 낮은 것 중 (우선순위가 낮고) 가장 오래된 것을 끊음
+        candidates = [i for i in playing if self.voices[i][1] <= priority]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+    
+    def play(self, name, sound):
+        """효과음 재생 (재시작 간격 안이거나 채널이 없으면 재생하지 않고 None 반환)"""
+        max_voices, min_interval_ms, priority = self.settings.get(name, SFX_DEFAULT_SETTINGS)
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < min_interval_ms:
+            return None
+        index = self._pick_channel(name, max_voices, priority)
+        if index is None:
+            return None
+        channel = self.channels[index]
+        channel.play(sound)
+        self.voices[index] = (name, priority, now)
+        self.last_played[name] = now
+        return channel
+    
+    def stop(self):
+        if self.channels is not None:
+            for channel in self.channels:
+                channel.stop()
+
 
 class SoundManager:
-    def __init__(self):
-        pygame.mixer.init()
+    def __init__(self, loader=None):
+        """loader(AssetLoader)가 있으면 믹서 초기화와 효과음 디코딩을 작업 스레드에서 하고 바로 반환"""
         self.bgm_volume = 0.6
         self.sfx_volume = 0.5
-        self.current_bgm = None
+        self.current_bgm = None  # 재생 중인 BGM 파일 경로
+        self.bgm_group = None
+        self.bgm_index = 0  # 그룹 안에서 재생 중인 곡 번호
+        self.pending_bgm = None  # 이전 곡이 다 줄어들거나 믹서 초기화가 끝나면 재생할 (그룹, loop, fade_ms)
         
         # 사운드 파일 자동 로드
         script_dir = os.path.dirname(os.path.abspath(__file__))
         sounds_dir = os.path.join(script_dir, "sounds")
         
-        # BGM 파일 로드 (sounds/bgm/ 폴더)
-        self.bgm_files = {}
-        bgm_dir = os.path.join(sounds_dir, "bgm")
-        if os.path.exists(bgm_dir):
-            for filename in os.listdir(bgm_dir):
-                if filename.endswith(('.ogg', '.wav', '.mp3')):
-                    filepath = os.path.join(bgm_dir, filename)
-                    try:
-                        sound = pygame.mixer.Sound(filepath)
-                        # BGM은 긴 파일이므로 Sound 객체로 저장
-                        self.bgm_files[filename] = sound
-                    except:
-                        pass
+        # BGM은 경로만 모아두고 재생할 때 pygame.mixer.music으로 스트리밍 (sounds/bgm/ 폴더)
+        self.bgm_tracks = find_bgm_tracks(os.path.join(sounds_dir, "bgm"))
+        
+        # 디코딩한 효과음 PCM 디스크 캐시 (config.AUDIO_CACHE_DIR)
+        self.audio_cache = AudioCache(os.path.join(script_dir, AUDIO_CACHE_DIR)) if AUDIO_CACHE_DIR else None
         
-        # 효과음 파일 로드 (sounds/sfx/ 폴더)
-        self.sfx_files = {}
+        # 효과음 파일 (sounds/sfx/ 폴더): 파일명에서 확장자 제거하여 키로 사용
+        sfx_paths = {}
         sfx_dir = os.path.join(sounds_dir, "sfx")
         if os.path.exists(sfx_dir):
             for filename in os.listdir(sfx_dir):
-                if filename.endswith(('.ogg', '.wav', '.mp3')):
-                    filepath = os.path.join(sfx_dir, filename)
-                    try:
-                        sound = pygame.mixer.Sound(filepath)
-                        sound.set_volume(self.sfx_volume)
-                        # 파일명에서 확장자 제거하여 키로 사용
-                        key = os.path.splitext(filename)[0]
-                        self.sfx_files[key] = sound
-                    except:
-                        pass
+                if filename.endswith(AUDIO_EXTENSIONS):
+                    sfx_paths[os.path.splitext(filename)[0]] = os.path.join(sfx_dir, filename)
+        
+        self.sfx_files = {}  # 디코딩이 끝난 효과음 (이름 -> Sound)
+        self.sfx_pending = {}  # 작업 스레드에서 디코딩 중인 효과음 (이름 -> Future)
+        self.sfx_pool = SfxChannelPool()
+        self.sfx_pool.set_volume(self.sfx_volume)
+        if loader is None:
+            self.mixer_future = None
+            self._init_mixer()
+            for key, filepath in sfx_paths.items():
+                self._add_sfx(key, self._load_sfx(filepath))
+        else:
+            # 믹서 초기화를 먼저 넣어서 효과음 작업이 항상 그 다음에 실행되도록 함
+            self.mixer_future = loader.submit("mixer", self._init_mixer)
+            for key, filepath in sfx_paths.items():
+                self.sfx_pending[key] = loader.submit("sfx:" + key, self._load_sfx, filepath)
+    
+    @staticmethod
+    def _init_mixer():
+        pygame.mixer.init()
+        pygame.mixer.set_num_channels(SFX_CHANNELS)
+        pygame.mixer.music.set_endevent(BGM_END_EVENT)
+    
+    def _load_sfx(self, filepath):
+        """효과음 파일 디코딩 (작업 스레드에서도 호출됨, 실패하면 None)"""
+        if self.mixer_future is not None:
+            self.mixer_future.result()  # 믹서 포맷이 정해진 뒤에 디코딩
+        try:
+            if self.audio_cache is not None:
+                return self.audio_cache.load(filepath)
+            return pygame.mixer.Sound(filepath)
+        except:
+            return None
+    
+    def _add_sfx(self, key, sound):
+        if sound is not None:
+            self.sfx_files[key] = sound
+    
+    def _collect_sfx(self, wait_for=None):
+        """디코딩이 끝난 효과음을 sfx_files로 옮김 (wait_for 이름은 끝날 때까지 기다림)"""
+        for key, future in list(self.sfx_pending.items()):
+            if key == wait_for or future.done():
+                del self.sfx_pending[key]
+                self._add_sfx(key, future.result())
+    
+    def mixer_ready(self):
+        """믹서 초기화가 끝났는지 (백그라운드 초기화 중이면 False)"""
+        return self.mixer_future is None or self.mixer_future.done()
     
     def set_bgm_volume(self, volume):
         """BGM 볼륨 설정 (0.0 ~ 1.0)"""
@@ -51,23 +199,70 @@ class SoundManager:
     def set_sfx_volume(self, volume):
         """효과음 볼륨 설정 (0.0 ~ 1.0)"""
         self.sfx_volume = max(0.0, min(1.0, volume))
-        for sound in self.sfx_files.values():
-            sound.set_volume(self.sfx_volume)
-    
-    def play_bgm(self, loop=-1):
-        """BGM 재생 (loop=-1: 무한 반복, 0: 한 번만)"""
-        # 첫 번째 BGM 파일 재생 (있는 경우)
-        if self.bgm_files:
-            bgm_name = list(self.bgm_files.keys())[0]
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            bgm_path = os.path.join(script_dir, "sounds", "bgm", bgm_name)
-            try:
-                pygame.mixer.music.load(bgm_path)
-                pygame.mixer.music.set_volume(self.bgm_volume)
-                pygame.mixer.music.play(loop)
-                self.current_bgm = "playing"  # 재생 중임을 표시
-            except:
-                pass
+        self.sfx_pool.set_volume(self.sfx_volume)  # Sound가 아니라 효과음 채널에 설정
+    
+    def tracks_for(self, group):
+        """그룹의 곡 리스트 (전용 곡이 없으면 기본 곡)"""
+        return self.bgm_tracks.get(group) or self.bgm_tracks.get(BGM_DEFAULT, [])
+    
+    def play_bgm(self, group=BGM_DEFAULT, loop=-1, fade_ms=BGM_FADE_MS):
+        """그룹의 BGM 재생 (loop=-1: 그룹의 곡을 차례로 무한 반복, 0: 첫 곡 한 번만)
+
+        다른 곡이 재생 중이면 fade_ms 동안 줄인 뒤 새 곡을 fade_ms 동안 키우며 시작한다.
+        """
+        if not self.tracks_for(group):
+            return
+        if not self.mixer_ready():
+            # 믹서 초기화가 끝나면 ASSET_LOADED_EVENT가 오고 handle_event에서 시작
+            self.pending_bgm = (group, loop, fade_ms)
+            return
+        if self.current_bgm and pygame.mixer.music.get_busy() and fade_ms > 0:
+            # 이전 곡이 다 줄어들면 BGM_END_EVENT가 오고 handle_event에서 새 곡 시작
+            self.pending_bgm = (group, loop, fade_ms)
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            self._start_bgm(group, loop, fade_ms)
+    
+    def _start_bgm(self, group, loop, fade_ms):
+        tracks = self.tracks_for(group)
+        self.pending_bgm = None
+        try:
+            pygame.mixer.music.load(tracks[0])
+            pygame.mixer.music.set_volume(self.bgm_volume)
+            if len(tracks) == 1 or loop == 0:
+                pygame.mixer.music.play(loop, fade_ms=fade_ms)
+            else:
+                # 여러 곡이면 다음 곡을 큐에 넣어서 곡 사이에 끊김 없이 이어서 재생
+                pygame.mixer.music.play(0, fade_ms=fade_ms)
+                pygame.mixer.music.queue(tracks[1])
+        except pygame.error:
+            return
+        self.bgm_group = group
+        self.bgm_index = 0
+        self.current_bgm = tracks[0]
+    
+    def handle_event(self, event):
+        """메인 루프의 이벤트 처리 (BGM 이벤트면 True 반환)"""
+        if event.type == ASSET_LOADED_EVENT:
+            # 백그라운드 로드 진행: 다 읽은 효과음을 옮기고, 믹서가 준비되면 기다리던 BGM 시작
+            self._collect_sfx()
+            if self.pending_bgm is not None and self.current_bgm is None and self.mixer_ready():
+                self.mixer_future.result()  # 믹서 초기화 중 난 예외는 여기서 발생
+                self._start_bgm(*self.pending_bgm)
+            return False  # 다른 곳 (진행률 표시)에서도 쓰는 이벤트
+        if event.type != BGM_END_EVENT:
+            return False
+        if self.pending_bgm is not None:
+            # 이전 곡이 다 줄어듦 → 새 곡 시작
+            self._start_bgm(*self.pending_bgm)
+        elif self.current_bgm and pygame.mixer.music.get_busy():
+            # 큐에 넣어둔 다음 곡으로 넘어감 → 그 다음 곡을 큐에 넣음
+            tracks = self.tracks_for(self.bgm_group)
+            if len(tracks) > 1:
+                self.bgm_index = (self.bgm_index + 1) % len(tracks)
+                self.current_bgm = tracks[self.bgm_index]
+                pygame.mixer.music.queue(tracks[(self.bgm_index + 1) % len(tracks)])
+        return True
     
     def pause_bgm(self):
         """BGM 일시정지"""
@@ -81,15 +276,60 @@ class SoundManager:
     
     def stop_bgm(self):
         """BGM 정지"""
-        pygame.mixer.music.stop()
+        self.pending_bgm = None
+        if self.mixer_ready():
+            pygame.mixer.music.stop()
         self.current_bgm = None
     
     def play_sfx(self, name):
-        """효과음 재생 (파일명에서 확장자 제거한 이름 사용)"""
+        """효과음 재생 (파일명에서 확장자 제거한 이름 사용, 아직 디코딩 중이면 끝날 때까지 기다림)"""
+        if name in self.sfx_pending:
+            self._collect_sfx(wait_for=name)
         if name in self.sfx_files:
-            self.sfx_files[name].play()
+            self.sfx_pool.play(name, self.sfx_files[name])
+
+
+class NullSoundManager:
+    """믹서를 전혀 쓰지 않는 SoundManager (오디오 장치가 없는 서버, 시뮬레이션, CI용)
+
+    SoundManager와 같은 메서드를 가지고, 재생 요청은 소리를 내지 않고 requests에
+    (메서드 이름, 인자...)로 최근 MAX_RECORDED_REQUESTS개까지 기록만 한다.
+    """
+    def __init__(self):
+        self.bgm_volume = 0.6
+        self.sfx_volume = 0.5
+        self.current_bgm = None  # 재생 중이라고 가정한 BGM 그룹
+        self.requests = deque(maxlen=MAX_RECORDED_REQUESTS)
+    
+    def set_bgm_volume(self, volume):
+        self.bgm_volume = max(0.0, min(1.0, volume))
+    
+    def set_sfx_volume(self, volume):
+        self.sfx_volume = max(0.0, min(1.0, volume))
+    
+    def play_bgm(self, group=BGM_DEFAULT, loop=-1, fade_ms=BGM_FADE_MS):
+        self.requests.append(("play_bgm", group, loop))
+        self.current_bgm = group
+    
+    def handle_event(self, event):
+        return False  # BGM 이벤트가 생기지 않음
+    
+    def pause_bgm(self):
+        self.requests.append(("pause_bgm",))
+    
+    def unpause_bgm(self):
+        self.requests.append(("unpause_bgm",))
+    
+    def stop_bgm(self):
+        self.requests.append(("stop_bgm",))
+        self.current_bgm = None
+    
+    def play_sfx(self, name):
+        self.requests.append(("play_sfx", name))
 
 
-def init_sound_manager():
-    """SoundManager 인스턴스 생성 및 반환"""
-    return SoundManager()
+def init_sound_manager(loader=None, headless=False):
+    """SoundManager 인스턴스 생성 및 반환 (loader가 있으면 백그라운드에서 로드, headless면 NullSoundManager)"""
+    if headless:
+        return NullSoundManager()
+    return SoundManager(loader)
@@ -0,0 +1,95 @@
+import pygame
+
+
+class SpatialGrid:
+    """균일 격자 공간 해시 - 사각형을 칸(cell)에 나눠 담고 주변 칸의 사각형만 찾아줌"""
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # (칸 x, 칸 y) -> 핸들 집합
+        self.rects = {}  # 핸들 -> Rect
+        self.cell_ranges = {}  # 핸들 -> 사각형이 걸쳐있는 칸 범위
+        self.next_handle = 0
+
+    @classmethod
+    def from_rects(cls, rects, cell_size=64):
+        """사각형 리스트로 격자 생성 (리스트 순서 = 핸들 순서)"""
+        grid = cls(cell_size)
+        for rect in rects:
+            grid.insert(rect)
+        return grid
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __iter__(self):
+        """모든 사각형을 추가된 순서대로 반환"""
+        for handle in sorted(self.rects):
+            yield self.rects[handle]
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        left = rect.left // size
+        top = rect.top // size
+        right = max(rect.left, rect.right - 1) // size
+        bottom = max(rect.top, rect.bottom - 1) // size
+        return left, top, right, bottom
+
+    def _add_to_cells(self, handle, cell_range):
+        left, top, right, bottom = cell_range
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                self.cells.setdefault((cx, cy), set()).add(handle)
+
+    def _remove_from_cells(self, handle, cell_range):
+        left, top, right, bottom = cell_range
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(handle)
+                    if not cell:
+                        del self.cells[(cx, cy)]
+
+    def insert(self, rect):
+        """사각형 추가 후 핸들 반환"""
+        handle = self.next_handle
+        self.next_handle += 1
+        rect = pygame.Rect(rect)
+        cell_range = self._cell_range(rect)
+        self.rects[handle] = rect
+        self.cell_ranges[handle] = cell_range
+        self._add_to_cells(handle, cell_range)
+        return handle
+
+    def update(self, handle, rect):
+        """움직인 사각형 위치 갱신 (걸쳐있는 칸이 바뀐 경우에만 다시 배치)"""
+        rect = pygame.Rect(rect)
+        self.rects[handle] = rect
+        old_range = self.cell_ranges[handle]
+        new_range = self._cell_range(rect)
+        if new_range != old_range:
+            self._remove_from_cells(handle, old_range)
+            self._add_to_cells(handle, new_range)
+            self.cell_ranges[handle] = new_range
+
+    def remove(self, handle):
+        """사각형 제거"""
+        self._remove_from_cells(handle, self.cell_ranges.pop(handle))
+        del self.rects[handle]
+
+    def query_handles(self, area):
+        """area와 같은 칸에 있는 사각형들의 핸들을 추가된 순서대로 반환"""
+        left, top, right, bottom = self._cell_range(area)
+        cells = self.cells
+        handles = set()
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    handles.update(cell)
+        return sorted(handles)
+
+    def query(self, area):
+        """area와 같은 칸에 있는 사각형들을 추가된 순서대로 반환"""
+        rects = self.rects
+        return [rects[handle] for handle in self.query_handles(area)]
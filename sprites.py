@@ -0,0 +1,104 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# 캐릭터 그리기 스타일: (눈 크기, 파도 사이를 사각형으로 채울지)
+STYLE_PLAYER = "player"  # Player.draw
+STYLE_SYNCED = "synced"  # SyncedPlayer.draw
+STYLE_PREVIEW = "preview"  # 메뉴 화면 캐릭터 미리보기
+GHOST_STYLES = {
+    STYLE_PLAYER: (4, False),
+    STYLE_SYNCED: (4, True),
+    STYLE_PREVIEW: (3, True),
+}
+
+KEY_COLOR = (255, 215, 0)
+KEY_OFFSET = (6, 12)  # 열쇠 표시 위치 (캐릭터 오른쪽 위)
+KEY_SIZE = 18
+
+MAX_SPRITES = 64
+
+
+def draw_ghost(surface, x, y, color, w, h, style=STYLE_PLAYER, has_key=False):
+    """유령 모양 캐릭터를 직접 그림 (캐시에 넣을 스프라이트를 만들 때 사용)"""
+    eye_size, fill_waves = GHOST_STYLES[style]
+
+    # 머리 부분 (원형)
+    head_radius = w // 2
+    head_center_x = x + w // 2
+    head_center_y = y + head_radius
+    pygame.draw.circle(surface, color, (head_center_x, head_center_y), head_radius)
+
+    # 몸통의 기본 사각형
+    body_bottom_y = y + h
+    pygame.draw.rect(surface, color, (x, head_center_y, w, h - head_radius))
+
+    # 아래쪽 파도 모양 (3개의 작은 반원)
+    wave_count = 3
+    wave_width = w // wave_count
+    for i in range(wave_count):
+        wave_center_x = x + i * wave_width + wave_width // 2
+        pygame.draw.circle(surface, color, (wave_center_x, body_bottom_y), wave_width // 2)
+    if fill_waves:
+        # 파도 사이의 공간을 채우기 위해 아래쪽에 사각형 추가
+        pygame.draw.rect(surface, color, (x, body_bottom_y - wave_width // 2, w, wave_width // 2))
+
+    # 눈 그리기 (작은 원 2개)
+    left_eye_x = head_center_x - head_radius // 2
+    right_eye_x = head_center_x + head_radius // 2
+    eye_y = head_center_y - head_radius // 3
+    pygame.draw.circle(surface, (0, 0, 0), (left_eye_x, eye_y), eye_size)
+    pygame.draw.circle(surface, (0, 0, 0), (right_eye_x, eye_y), eye_size)
+
+    if has_key:
+        pygame.draw.rect(surface, KEY_COLOR, (x + w + KEY_OFFSET[0], y + KEY_OFFSET[1], KEY_SIZE, KEY_SIZE))
+
+
+class SpriteCache:
+    """(스타일, 색상, 크기, 열쇠 여부)별로 캐릭터를 한 번만 그려서 Surface로 저장해두고 blit
+
+    최근에 쓴 순서로 max_sprites개까지 보관하고, 색상을 바꾸면 discard_color로 이전 색상을 지운다.
+    """
+    def __init__(self, max_sprites=MAX_SPRITES):
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()  # (스타일, 색상, w, h, 열쇠) -> Surface
+
+    def get(self, color, w, h, style=STYLE_PLAYER, has_key=False):
+        key = (style, tuple(color), w, h, has_key)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        sprite = self._render(color, w, h, style, has_key)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def _render(self, color, w, h, style, has_key):
+        # 파도 반원이 몸통 아래로 튀어나오고, 열쇠는 오른쪽에 붙으므로 그만큼 크게 만듦
+        width = w + KEY_OFFSET[0] + KEY_SIZE if has_key else w
+        height = h + (w // 3) // 2 + 1
+        sprite = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+        draw_ghost(sprite, 0, 0, color, w, h, style, has_key)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+
+    def draw(self, surface, x, y, color, w, h, style=STYLE_PLAYER, has_key=False):
+        """(x, y)에 캐릭터 그리기 (draw_ghost와 같은 결과)"""
+        surface.blit(self.get(color, w, h, style, has_key), (x, y))
+
+    def discard_color(self, color):
+        """color로 만든 스프라이트 전부 제거 (캐릭터 색상을 바꿨을 때)"""
+        color = tuple(color)
+        for key in [key for key in self.sprites if key[1] == color]:
+            del self.sprites[key]
+
+    def clear(self):
+        self.sprites.clear()
+
+
+# 게임 전체에서 같이 쓰는 캐시
+sprite_cache = SpriteCache()
@@ -0,0 +1,110 @@
+from spatial import SpatialGrid
+
+
+# 트리거 종류
+TRIGGER_SPIKE = "spike"
+TRIGGER_KEY = "key"
+TRIGGER_DOOR = "door"
+TRIGGER_BUTTON = "button"
+
+# update()가 반환하는 이벤트
+TRIGGER_ENTER = "enter"
+TRIGGER_EXIT = "exit"
+
+
+class TriggerVolume:
+    """플레이어가 들어오고 나가는 것을 감지할 영역 (owner는 가시, 열쇠 같은 연결된 오브젝트)"""
+    __slots__ = ("rect", "kind", "owner", "handle")
+
+    def __init__(self, rect, kind, owner=None, handle=None):
+        self.rect = rect
+        self.kind = kind
+        self.owner = owner
+        self.handle = handle
+
+
+class TriggerIndex:
+    """트리거 영역을 공간 격자에 넣어두고, 플레이어가 영역 경계를 넘을 때만 enter/exit 이벤트를 만듦
+
+    플레이어 위치가 바뀌지 않으면 아무것도 검사하지 않고, 위치가 바뀌어도 주변 칸의 영역만
+    검사하므로 영역이 수백 개여도 틱당 비용은 플레이어 수에 비례한다. 영역 안에 있는 플레이어
+    (occupants)와 종류별 인원 수를 계속 유지한다.
+    """
+    def __init__(self, cell_size=128):
+        self.grid = SpatialGrid(cell_size)
+        self.volumes = {}  # 핸들 -> TriggerVolume
+        self.players = []
+        self.clear()
+
+    def add(self, rect, kind, owner=None):
+        """영역 추가 (플레이어 위치는 다음 update에서 반영)"""
+        handle = self.grid.insert(rect)
+        volume = TriggerVolume(self.grid.rects[handle], kind, owner, handle)
+        self.volumes[handle] = volume
+        self.occupant_indices[handle] = set()
+        return volume
+
+    def clear(self):
+        """모든 플레이어를 영역 밖으로 간주 (다음 update에서 현재 위치 기준으로 다시 계산)"""
+        self.inside = []  # 플레이어 번호 -> 들어가 있는 영역 핸들 집합
+        self.last_rects = []  # 플레이어 번호 -> 마지막으로 검사한 Rect
+        self.occupant_indices = {handle: set() for handle in self.volumes}
+        self.kind_counts = {}
+
+    def update(self, players):
+        """플레이어 위치를 반영하고 [(TRIGGER_ENTER 또는 TRIGGER_EXIT, 플레이어 번호, 영역)] 반환"""
+        if len(players) != len(self.inside):
+            self.clear()
+            self.inside = [set() for _ in players]
+            self.last_rects = [None] * len(players)
+        self.players = players
+        events = []
+        grid_rects = self.grid.rects
+        cells = self.grid.cells
+        size = self.grid.cell_size
+        for index, player in enumerate(players):
+            rect = player.rect()
+            # rect()는 위치가 그대로면 같은 Rect 객체를 반환함
+            if rect is self.last_rects[index]:
+                continue
+            self.last_rects[index] = rect
+            # 플레이어가 걸친 칸의 영역만 검사 (SpatialGrid.query_handles를 풀어 쓴 것, 정렬 불필요)
+            now = set()
+            for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+                for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                    cell = cells.get((cx, cy))
+                    if cell:
+                        for handle in cell:
+                            if rect.colliderect(grid_rects[handle]):
+                                now.add(handle)
+            before = self.inside[index]
+            if now == before:
+                continue
+            for handle in sorted(before - now):
+                self._leave(index, handle)
+                events.append((TRIGGER_EXIT, index, self.volumes[handle]))
+            for handle in sorted(now - before):
+                self._enter(index, handle)
+                events.append((TRIGGER_ENTER, index, self.volumes[handle]))
+            self.inside[index] = now
+        return events
+
+    def _enter(self, index, handle):
+        self.occupant_indices[handle].add(index)
+        kind = self.volumes[handle].kind
+        self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+
+    def _leave(self, index, handle):
+        self.occupant_indices[handle].discard(index)
+        self.kind_counts[self.volumes[handle].kind] -= 1
+
+    def occupants(self, volume):
+        """영역 안에 있는 플레이어 리스트 (플레이어 순서대로)"""
+        indices = self.occupant_indices[volume.handle]
+        if not indices:
+            return []
+        return [self.players[index] for index in sorted(indices)]
+
+    def occupied(self, kind):
+        """kind 종류의 영역 중 하나라도 플레이어가 들어가 있는지"""
+        return self.kind_counts.get(kind, 0) > 0
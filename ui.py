@@ -1,5 +1,97 @@
+from collections import OrderedDict
+
 import pygame
 
+from canvas import draw_circle, draw_rect, mouse_pos
+
+MAX_CACHED_TEXTS = 256
+MAX_CACHED_SURFACES = 32
+
+
+class TextCache:
+    """(폰트, 텍스트, 색상, 안티앨리어싱)별로 font.render 결과를 보관하는 LRU 캐시
+
+    매 프레임 같은 글자를 다시 렌더링하지 않도록 최근에 쓴 max_entries개를 보관한다.
+    반환된 Surface는 여러 곳에서 같이 쓰므로 수정하면 안 된다.
+    """
+    def __init__(self, max_entries=MAX_CACHED_TEXTS):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()  # (폰트, 텍스트, 색상, 안티앨리어싱) -> Surface
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# 게임 전체에서 같이 쓰는 텍스트 캐시
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """font.render(text, antialias, color)와 같지만 캐시된 Surface를 반환"""
+    return text_cache.render(font, text, color, antialias)
+
+
+class SurfaceCache:
+    """반투명 오버레이와 그림자 Surface를 크기와 투명도별로 한 번만 만들어 재사용하는 LRU 캐시
+
+    반환된 Surface는 여러 곳에서 같이 쓰므로 blit만 하고 수정하면 안 된다.
+    """
+    def __init__(self, max_entries=MAX_CACHED_SURFACES):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()  # (종류, 크기, 색상, 투명도) -> Surface
+
+    def _get(self, key, create):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = self.surfaces[key] = create()
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def overlay(self, size, alpha, color=(0, 0, 0)):
+        """화면 전체를 덮는 반투명 오버레이 (Surface 전체 투명도)"""
+        def create():
+            overlay = pygame.Surface(size)
+            overlay.set_alpha(alpha)
+            overlay.fill(color)
+            return overlay
+        return self._get(("overlay", tuple(size), tuple(color), alpha), create)
+
+    def shadow(self, size, color=(0, 0, 0, 80)):
+        """반투명 그림자 (픽셀별 투명도)"""
+        def create():
+            shadow = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(shadow, color, (0, 0, size[0], size[1]))
+            return shadow
+        return self._get(("shadow", tuple(size), tuple(color), None), create)
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# 게임 전체에서 같이 쓰는 반투명 Surface 캐시
+surface_cache = SurfaceCache()
+
 
 def has_korean(text):
     """텍스트에 한글이 포함되어 있는지 확인"""
@@ -22,7 +114,7 @@ class Button:
             korean_font: 한글 폰트 (선택사항, None이면 자동 감지)
             shadow: 그림자 효과 사용 여부 (기본값: True)
         """
-        mx, my = pygame.mouse.get_pos()
+        mx, my = mouse_pos()
         current_color = self.hover if self.rect.collidepoint(mx, my) else self.color
         
         # 그림자 효과 (입체감)
@@ -34,18 +126,17 @@ class Button:
                 self.rect.w,
                 self.rect.h
             )
-            # 반투명 검은색 그림자
-            shadow_surface = pygame.Surface((shadow_rect.w, shadow_rect.h), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_surface, (0, 0, 0, 80), (0, 0, shadow_rect.w, shadow_rect.h))
+            # 반투명 검은색 그림자 (버튼 크기별로 한 번만 만들어 재사용)
+            shadow_surface = surface_cache.shadow((shadow_rect.w, shadow_rect.h), (0, 0, 0, 80))
             surface.blit(shadow_surface, (shadow_rect.x, shadow_rect.y))
         
-        pygame.draw.rect(surface, current_color, self.rect)
-        pygame.draw.rect(surface, (0, 0, 0), self.rect, 2)
+        draw_rect(surface, current_color, self.rect)
+        draw_rect(surface, (0, 0, 0), self.rect, 2)
         
         # 한글 폰트가 제공되고 텍스트에 한글이 있으면 한글 폰트 사용
         use_font = korean_font if (korean_font and has_korean(self.text)) else font
             
-        label = use_font.render(self.text, True, (0, 0, 0))
+        label = render_text(use_font, self.text, (0, 0, 0))
         surface.blit(
             label,
             (
@@ -71,12 +162,12 @@ class Slider:
         self.dragging = False
 
     def draw(self, surface):
-        pygame.draw.rect(surface, (200, 200, 200), (self.x, self.y, self.w, 8))
-        pygame.draw.circle(surface, (0, 160, 255), (int(self.handle_x), self.y + 4), 12)
+        draw_rect(surface, (200, 200, 200), (self.x, self.y, self.w, 8))
+        draw_circle(surface, (0, 160, 255), (int(self.handle_x), self.y + 4), 12)
         return self.value
 
     def handle_event(self, event):
-        mx, my = pygame.mouse.get_pos()
+        mx, my = mouse_pos()
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if abs(mx - self.handle_x) <= 15 and abs(my - (self.y + 4)) <= 15:
                 self.dragging = True
@@ -103,6 +194,6 @@ def draw_text_center(surface, text, font, color, x, y, korean_font=None):
     # 한글 폰트가 제공되고 텍스트에 한글이 있으면 한글 폰트 사용
     use_font = korean_font if (korean_font and has_korean(text)) else font
         
-    label = use_font.render(text, True, color)
+    label = render_text(use_font, text, color)
     surface.blit(label, (x - label.get_width() // 2, y))
 